@@ -3,36 +3,48 @@ CLI Handler for Bite Tracker.
 Handles all user interaction for restaurants and visits.
 """
 
-from datetime import date, datetime
-from typing import Optional
-from services import RestaurantService, VisitService
+import sys
+from typing import TYPE_CHECKING
 from exceptions import (
     ValidationError,
     NotFoundError,
-    BusinessRuleViolationError,
-    RepositoryError
+    BusinessRuleViolationError
 )
-from validators import InputValidator
+
+if TYPE_CHECKING:
+    from services import RestaurantService, VisitService
+
+_BAR = "=" * 60
 
 
 class CLIHandler:
     """Handles all CLI interactions."""
 
-    def __init__(self, restaurant_service: RestaurantService, visit_service: VisitService):
+    def __init__(self, restaurant_service: "RestaurantService", visit_service: "VisitService"):
         """Initialize with service dependencies."""
+        # Deferred so importing the cli package stays cheap
+        from validators import InputValidator
+
         self.restaurant_service = restaurant_service
         self.visit_service = visit_service
         self.validator = InputValidator()
 
+        # Bound once so prompts and writes skip the sys attribute lookups
+        self._write = sys.stdout.write
+        self._flush = sys.stdout.flush
+        self._readline = sys.stdin.readline
+
+        # Piped input (scripts, fixtures) is read in one go on first use
+        self._interactive = sys.stdin.isatty()
+        self._pending_lines = None
+
     def clear_screen(self):
-        """Clear the terminal screen."""
-        print("\n" * 2)  # Simple spacing instead of actual clear
+        """Clear the terminal screen (or add spacing when not a terminal)."""
+        self._write("\x1b[2J\x1b[H" if sys.stdout.isatty() else "\n\n")
 
     def print_header(self, title: str):
         """Print a formatted header."""
-        print("\n" + "=" * 60)
-        print(f"  {title}")
-        print("=" * 60)
+        self._write(f"\n{_BAR}\n  {title}\n{_BAR}\n")
 
     def print_error(self, message: str):
         """Print an error message."""
@@ -42,9 +54,46 @@ class CLIHandler:
         """Print a success message."""
         print(f"\n {message}")
 
+    def read_input(self, prompt: str = "") -> str:
+        """
+        Read one line of user input.
+        Lighter than input(): writes the prompt and reads stdin directly.
+        When stdin is not a terminal, all of it is read at once and
+        later prompts are answered from memory.
+        Raises: EOFError: If stdin is exhausted
+        """
+        self._write(prompt)
+
+        if not self._interactive:
+            if self._pending_lines is None:
+                self._pending_lines = iter(sys.stdin.read().splitlines())
+            try:
+                return next(self._pending_lines)
+            except StopIteration:
+                raise EOFError("EOF when reading a line") from None
+
+        self._flush()
+        line = self._readline()
+        if not line:
+            raise EOFError("EOF when reading a line")
+        return line.rstrip("\n")
+
     def pause(self):
         """Wait for user to press Enter."""
-        input("\nPress Enter to continue...")
+        # End of a screen: push out everything written for this action
+        self._flush()
+        self.read_input("\nPress Enter to continue...")
+
+    @staticmethod
+    def _restaurant_for(restaurants: dict, visit):
+        """
+        Look up a visit's restaurant in an id -> Restaurant dict.
+        Raises: NotFoundError: If the restaurant is missing
+        """
+        restaurant = restaurants.get(visit.restaurant_id)
+        if restaurant is None:
+            raise NotFoundError(f"Restaurant with ID {visit.restaurant_id} not found")
+        return restaurant
 
     # ==================== RESTAURANT OPERATIONS ====================
     def add_restaurant(self):
@@ -53,16 +102,16 @@ class CLIHandler:
 
         try:
             # Get required fields
-            name = input("Restaurant name: ").strip()
-            location = input("Location (city/address): ").strip()
-            country = input("Country: ").strip()
-            price_range = input("Price range (1=€, 2=€€, 3=€€€, 4=€€€€): ").strip()
+            name = self.read_input("Restaurant name: ").strip()
+            location = self.read_input("Location (city/address): ").strip()
+            country = self.read_input("Country: ").strip()
+            price_range = self.read_input("Price range (1=€, 2=€€, 3=€€€, 4=€€€€): ").strip()
 
             # Get optional fields
-            cuisine_type = input("Cuisine type (optional, press Enter to skip): ").strip() or None
-            phone = input("Phone (optional): ").strip() or None
-            website = input("Website (optional): ").strip() or None
-            social_media = input("Social media (optional): ").strip() or None
+            cuisine_type = self.read_input("Cuisine type (optional, press Enter to skip): ").strip() or None
+            phone = self.read_input("Phone (optional): ").strip() or None
+            website = self.read_input("Website (optional): ").strip() or None
+            social_media = self.read_input("Social media (optional): ").strip() or None
 
             # Create restaurant
             restaurant = self.restaurant_service.create_restaurant(
@@ -90,22 +139,19 @@ class CLIHandler:
         self.print_header("All Restaurants")
 
         try:
-            restaurants = self.restaurant_service.get_all_restaurants()
+            # Display text comes preformatted from the database
+            listing = self.restaurant_service.get_restaurant_listing()
 
-            if not restaurants:
+            if not listing:
                 print("\nNo restaurants found. Add some first!")
                 return
 
-            print(f"\nTotal restaurants: {len(restaurants)}\n")
-            for i, r in enumerate(restaurants, 1):
-                print(f"{i}. {r}")
-                if r.phone:
-                    print(f"   Phone: {r.phone}")
-                if r.website:
-                    print(f"   Website: {r.website}")
-                if r.social_media:
-                    print(f"   Social: {r.social_media}")
-                print()
+            # Build the whole listing and write it in one call
+            lines = [f"\nTotal restaurants: {len(listing)}\n"]
+            for i, (_, display) in enumerate(listing, 1):
+                lines.append(f"{i}. {display}")
+                lines.append("")
+            self._write("\n".join(lines) + "\n")
 
         except Exception as e:
             self.print_error(f"Failed to load restaurants: {e}")
@@ -115,7 +161,7 @@ class CLIHandler:
         self.print_header("Search Restaurants")
 
         try:
-            search_term = input("Enter search term: ").strip()
+            search_term = self.read_input("Enter search term: ").strip()
 
             results = self.restaurant_service.search_restaurants(search_term)
 
@@ -137,7 +183,7 @@ class CLIHandler:
         self.print_header("Filter by Country")
 
         try:
-            country = input("Enter country name: ").strip()
+            country = self.read_input("Enter country name: ").strip()
 
             results = self.restaurant_service.get_restaurants_by_country(country)
 
@@ -165,19 +211,25 @@ class CLIHandler:
                 print("\nNo restaurants to delete.")
                 return
 
+            restaurant_ids = set()
             print("\nAvailable restaurants:")
             for i, r in enumerate(restaurants, 1):
+                restaurant_ids.add(r.id)
                 print(f"{i}. {r.name} (ID: {r.id})")
 
-            restaurant_id = input("\nEnter restaurant ID to delete: ").strip()
+            restaurant_id = int(self.read_input("\nEnter restaurant ID to delete: ").strip())
+
+            # Check against the list just shown rather than querying again
+            if restaurant_id not in restaurant_ids:
+                raise NotFoundError(f"Restaurant with ID {restaurant_id} not found")
 
             # Confirm deletion
-            confirm = input(f"Are you sure you want to delete restaurant ID {restaurant_id}? (yes/no): ").strip().lower()
+            confirm = self.read_input(f"Are you sure you want to delete restaurant ID {restaurant_id}? (yes/no): ").strip().lower()
             if confirm != 'yes':
                 print("Deletion cancelled.")
                 return
 
-            self.restaurant_service.delete_restaurant(int(restaurant_id))
+            self.restaurant_service.delete_restaurant(restaurant_id)
             self.print_success("Restaurant deleted successfully!")
 
         except NotFoundError as e:
@@ -197,43 +249,42 @@ class CLIHandler:
 
         try:
             # First, show available restaurants
-            restaurants = self.restaurant_service.get_all_restaurants()
+            # Restaurants and their visits arrive together in one query
+            restaurants = self.restaurant_service.get_restaurants_with_visits()
             if not restaurants:
                 print("\nNo restaurants available. Add a restaurant first!")
                 return
 
             print("\nAvailable restaurants:")
-            for i, r in enumerate(restaurants, 1):
-                # Check if restaurant already has a visit
-                existing_visit = self.visit_service.get_visit_for_restaurant(r.id)
-                status = " [HAS VISIT]" if existing_visit else ""
+            for i, (r, visit) in enumerate(restaurants, 1):
+                status = " [HAS VISIT]" if visit is not None else ""
                 print(f"{i}. {r.name} (ID: {r.id}){status}")
 
             # Get restaurant ID
-            restaurant_id = input("\nEnter restaurant ID: ").strip()
+            restaurant_id = self.read_input("\nEnter restaurant ID: ").strip()
 
             # Get visit details
             print("\nVisit Details:")
-            visit_date_str = input("Visit date (YYYY-MM-DD, DD/MM/YYYY, or DD-MM-YYYY): ").strip()
-            rating = input("Overall rating (1-5): ").strip()
-            meal_type = input("Meal type (breakfast/lunch/dinner/brunch/other): ").strip()
+            visit_date_str = self.read_input("Visit date (YYYY-MM-DD, DD/MM/YYYY, or DD-MM-YYYY): ").strip()
+            rating = self.read_input("Overall rating (1-5): ").strip()
+            meal_type = self.read_input("Meal type (breakfast/lunch/dinner/brunch/other): ").strip()
 
             # Optional fields
             print("\nOptional Details (press Enter to skip):")
-            service_rating = input("Service rating (1-5): ").strip() or None
-            dishes_ordered = input("Dishes ordered: ").strip() or None
-            recommended_dishes = input("Recommended dishes: ").strip() or None
-            beverage_ordered = input("Beverages: ").strip() or None
-            total_cost = input("Total cost (€): ").strip() or None
-            notes = input("Notes: ").strip() or None
-            would_return = input("Would you return? (yes/no, default yes): ").strip().lower() or "yes"
+            service_rating = self.read_input("Service rating (1-5): ").strip() or None
+            dishes_ordered = self.read_input("Dishes ordered: ").strip() or None
+            recommended_dishes = self.read_input("Recommended dishes: ").strip() or None
+            beverage_ordered = self.read_input("Beverages: ").strip() or None
+            total_cost = self.read_input("Total cost (€): ").strip() or None
+            notes = self.read_input("Notes: ").strip() or None
+            would_return = self.read_input("Would you return? (yes/no, default yes): ").strip().lower() or "yes"
 
             # Parse date
             visit_date = self.validator.validate_date(visit_date_str)
 
             # Parse optional numeric fields
-            service_rating_int = int(service_rating) if service_rating else None
-            total_cost_float = float(total_cost) if total_cost else None
+            service_rating_int = self.validator.validate_optional_int(service_rating, "Service rating")
+            total_cost_float = self.validator.validate_optional_float(total_cost, "Total cost")
 
             # Parse boolean
             would_return_bool = would_return in ['yes', 'y']
@@ -278,24 +329,27 @@ class CLIHandler:
                 print("\nNo visits recorded yet. Add some first!")
                 return
 
-            print(f"\nTotal visits: {len(visits)}\n")
+            # Load restaurants once instead of querying per visit
+            restaurants = {r.id: r for r in self.restaurant_service.iter_restaurants()}
+
+            lines = [f"\nTotal visits: {len(visits)}\n"]
             for i, v in enumerate(visits, 1):
-                # Get the restaurant for this visit
-                restaurant = self.restaurant_service.get_restaurant(v.restaurant_id)
+                restaurant = self._restaurant_for(restaurants, v)
 
                 cuisine = f" ({restaurant.cuisine_type})" if restaurant.cuisine_type else ""
-                print(f"{i}. {restaurant.name}{cuisine} - {restaurant.country}")
+                lines.append(f"{i}. {restaurant.name}{cuisine} - {restaurant.country}")
 
-                print(f"   {v}")
+                lines.append(f"   {v}")
                 if v.service_rating:
-                    print(f"   Service: {v.get_service_rating_stars()}")
+                    lines.append(f"   Service: {v.get_service_rating_stars()}")
                 if v.dishes_ordered:
-                    print(f"   Dishes: {v.dishes_ordered}")
+                    lines.append(f"   Dishes: {v.dishes_ordered}")
                 if v.total_cost:
-                    print(f"   Cost: {v.get_formatted_cost()}")
+                    lines.append(f"   Cost: {v.get_formatted_cost()}")
                 if v.notes:
-                    print(f"   Notes: {v.notes}")
-                print()
+                    lines.append(f"   Notes: {v.notes}")
+                lines.append("")
+            self._write("\n".join(lines) + "\n")
 
         except Exception as e:
             self.print_error(f"Failed to load visits: {e}")
@@ -305,7 +359,7 @@ class CLIHandler:
         self.print_header("Filter Visits by Rating")
 
         try:
-            min_rating = input("Minimum rating (1-5): ").strip()
+            min_rating = self.read_input("Minimum rating (1-5): ").strip()
 
             visits = self.visit_service.get_top_rated_visits(int(min_rating))
 
@@ -313,9 +367,11 @@ class CLIHandler:
                 print(f"\nNo visits found with rating >= {min_rating}")
                 return
 
+            restaurants = {r.id: r for r in self.restaurant_service.iter_restaurants()}
+
             print(f"\nVisits with rating >= {min_rating} ({len(visits)}):\n")
             for i, v in enumerate(visits, 1):
-                restaurant = self.restaurant_service.get_restaurant(v.restaurant_id)
+                restaurant = self._restaurant_for(restaurants, v)
                 print(f"{i}. {restaurant.name} - {v.get_formatted_date()} - {v.get_rating_stars()}")
 
         except ValidationError as e:
@@ -331,7 +387,7 @@ class CLIHandler:
 
         try:
             print("\nMeal types: breakfast, lunch, dinner, brunch, other")
-            meal_type = input("Enter meal type: ").strip()
+            meal_type = self.read_input("Enter meal type: ").strip()
 
             visits = self.visit_service.get_visits_by_meal_type(meal_type)
 
@@ -339,9 +395,11 @@ class CLIHandler:
                 print(f"\nNo {meal_type} visits found")
                 return
 
+            restaurants = {r.id: r for r in self.restaurant_service.iter_restaurants()}
+
             print(f"\n{meal_type.capitalize()} visits ({len(visits)}):\n")
             for i, v in enumerate(visits, 1):
-                restaurant = self.restaurant_service.get_restaurant(v.restaurant_id)
+                restaurant = self._restaurant_for(restaurants, v)
                 print(f"{i}. {restaurant.name} - {v.get_formatted_date()}")
 
         except ValidationError as e:
@@ -360,20 +418,28 @@ class CLIHandler:
                 print("\nNo visits to delete.")
                 return
 
+            restaurants = {r.id: r for r in self.restaurant_service.iter_restaurants()}
+
+            visit_ids = set()
             print("\nAvailable visits:")
             for i, v in enumerate(visits, 1):
-                restaurant = self.restaurant_service.get_restaurant(v.restaurant_id)
+                visit_ids.add(v.id)
+                restaurant = self._restaurant_for(restaurants, v)
                 print(f"{i}. {restaurant.name} - {v.get_formatted_date()} (ID: {v.id})")
 
-            visit_id = input("\nEnter visit ID to delete: ").strip()
+            visit_id = int(self.read_input("\nEnter visit ID to delete: ").strip())
+
+            # Check against the list just shown rather than querying again
+            if visit_id not in visit_ids:
+                raise NotFoundError(f"Visit with ID {visit_id} not found")
 
             # Confirm deletion
-            confirm = input(f"Are you sure you want to delete visit ID {visit_id}? (yes/no): ").strip().lower()
+            confirm = self.read_input(f"Are you sure you want to delete visit ID {visit_id}? (yes/no): ").strip().lower()
             if confirm != 'yes':
                 print("Deletion cancelled.")
                 return
 
-            self.visit_service.delete_visit(int(visit_id))
+            self.visit_service.delete_visit(visit_id)
             self.print_success("Visit deleted successfully!")
 
         except NotFoundError as e:
@@ -3,8 +3,33 @@ Main menu system for Bite Tracker.
 Handles navigation and user flow through the application.
 """
 
+import sys
 from cli.cli_handler import CLIHandler
 
+_BAR = "=" * 60
+
+# The menu is static, so it is built once and written in a single call
+_MENU_BANNER = (
+    "\n" + _BAR + "\n"
+    "  BITE TRACKER - Restaurant Visit Manager\n"
+    + _BAR + "\n"
+    "\n[RESTAURANTS]\n"
+    "  1. Add Restaurant\n"
+    "  2. View All Restaurants\n"
+    "  3. Search Restaurants\n"
+    "  4. Filter by Country\n"
+    "  5. Delete Restaurant\n"
+    "\n[VISITS]\n"
+    "  6. Add Visit\n"
+    "  7. View All Visits\n"
+    "  8. Filter Visits by Rating\n"
+    "  9. Filter Visits by Meal Type\n"
+    "  10. Delete Visit\n"
+    "\n[OTHER]\n"
+    "  0. Exit\n"
+    + _BAR + "\n"
+)
+
 
 class MainMenu:
     """Main menu for Bite Tracker application."""
@@ -14,73 +39,43 @@ class MainMenu:
         self.running = True
         self.data_modified = False
 
+        # Menu choice -> (handler, whether it modifies data)
+        self._actions = {
+            # Restaurant operations
+            '1': (self.cli.add_restaurant, True),
+            '2': (self.cli.view_all_restaurants, False),
+            '3': (self.cli.search_restaurants, False),
+            '4': (self.cli.filter_by_country, False),
+            '5': (self.cli.delete_restaurant, True),
+
+            # Visit operations
+            '6': (self.cli.add_visit, True),
+            '7': (self.cli.view_all_visits, False),
+            '8': (self.cli.filter_visits_by_rating, False),
+            '9': (self.cli.filter_visits_by_meal_type, False),
+            '10': (self.cli.delete_visit, True),
+        }
+
     def display_main_menu(self):
         """Display the main menu options."""
-        print("\n" + "=" * 60)
-        print("  BITE TRACKER - Restaurant Visit Manager")
-        print("=" * 60)
-        print("\n[RESTAURANTS]")
-        print("  1. Add Restaurant")
-        print("  2. View All Restaurants")
-        print("  3. Search Restaurants")
-        print("  4. Filter by Country")
-        print("  5. Delete Restaurant")
-        print("\n[VISITS]")
-        print("  6. Add Visit")
-        print("  7. View All Visits")
-        print("  8. Filter Visits by Rating")
-        print("  9. Filter Visits by Meal Type")
-        print("  10. Delete Visit")
-        print("\n[OTHER]")
-        print("  0. Exit")
-        print("=" * 60)
+        sys.stdout.write(_MENU_BANNER)
 
     def run(self):
         """Run the main menu loop."""
         while self.running:
             self.display_main_menu()
-            choice = input("\nEnter your choice: ").strip()
+            choice = self.cli.read_input("\nEnter your choice: ").strip()
 
             self.handle_choice(choice)
 
     def handle_choice(self, choice: str):
         """Handle user menu selection."""
-        # Restaurant operations
-        if choice == '1':
-            self.cli.add_restaurant()
-            self.data_modified = True
-            self.cli.pause()
-        elif choice == '2':
-            self.cli.view_all_restaurants()
-            self.cli.pause()
-        elif choice == '3':
-            self.cli.search_restaurants()
-            self.cli.pause()
-        elif choice == '4':
-            self.cli.filter_by_country()
-            self.cli.pause()
-        elif choice == '5':
-            self.cli.delete_restaurant()
-            self.data_modified = True
-            self.cli.pause()
-
-        # Visit operations
-        elif choice == '6':
-            self.cli.add_visit()
-            self.data_modified = True
-            self.cli.pause()
-        elif choice == '7':
-            self.cli.view_all_visits()
-            self.cli.pause()
-        elif choice == '8':
-            self.cli.filter_visits_by_rating()
-            self.cli.pause()
-        elif choice == '9':
-            self.cli.filter_visits_by_meal_type()
-            self.cli.pause()
-        elif choice == '10':
-            self.cli.delete_visit()
-            self.data_modified = True
+        action = self._actions.get(choice)
+        if action is not None:
+            handler, modifies_data = action
+            handler()
+            if modifies_data:
+                self.data_modified = True
             self.cli.pause()
 
         # Exit
@@ -94,13 +89,12 @@ class MainMenu:
 
     def exit_application(self):
         """Exit the application gracefully."""
-        print("\n" + "=" * 60)
-        print("  Thank you for using Bite Tracker!")
-
         if self.data_modified:
-            print("  Your changes have been saved.")
+            closing = "  Your changes have been saved."
         else:
-            print("  Come back soon to track more visits!")
+            closing = "  Come back soon to track more visits!"
 
-        print("=" * 60 + "\n")
+        sys.stdout.write(
+            f"\n{_BAR}\n  Thank you for using Bite Tracker!\n{closing}\n{_BAR}\n\n"
+        )
         self.running = False
@@ -5,6 +5,7 @@ from .exceptions import (
     ValidationError,
     RepositoryError,
     NotFoundError,
+    DuplicateEntryError,
     BusinessRuleViolationError
 )
 
@@ -13,5 +14,6 @@ __all__ = [
     'ValidationError',
     'RepositoryError',
     'NotFoundError',
+    'DuplicateEntryError',
     'BusinessRuleViolationError'
 ]
@@ -6,24 +6,29 @@ specific error scenarios in the application.
 
 class BiteTrackerError(Exception):
     """Base exception for all Bite Tracker errors."""
-    pass
+    __slots__ = ()
 
 
 class ValidationError(BiteTrackerError):
     """Raised when input validation fails."""
-    pass
+    __slots__ = ()
 
 
 class RepositoryError(BiteTrackerError):
     """Raised when database operations fail."""
-    pass
+    __slots__ = ()
 
 
 class NotFoundError(RepositoryError):
     """Raised when a requested entity is not found in the database."""
-    pass
+    __slots__ = ()
+
+
+class DuplicateEntryError(RepositoryError):
+    """Raised when a write would break a uniqueness constraint."""
+    __slots__ = ()
 
 
 class BusinessRuleViolationError(BiteTrackerError):
     """Raised when business rule is violated."""
-    pass
+    __slots__ = ()
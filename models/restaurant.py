@@ -5,12 +5,25 @@ Enforces data integrity and domain rules.
 """
 
 
+import sys
 from dataclasses import dataclass
 from typing import Optional
 from exceptions import ValidationError
 
+# (attribute, label, required, max length) for each text field,
+# checked in order by Restaurant._validate
+_TEXT_FIELDS = (
+    ("name", "Restaurant name", True, 100),
+    ("location", "Location", True, 150),
+    ("country", "Country", True, 100),
+    ("cuisine_type", "Cuisine type", False, 50),
+    ("phone", "Phone number", False, 20),
+    ("website", "Website URL", False, 200),
+    ("social_media", "Social media URL", False, 50),
+)
 
-@dataclass
+
+@dataclass(slots=True)
 class Restaurant:
     """
     Represents a restaurant entity.
@@ -22,7 +35,7 @@ class Restaurant:
     - Price Range must be 1-4 (representing €, €€, €€€, €€€€)
     - Cuisine Type is optional but if provided must be <= 50 characters
     - Phone is optional but if provided must be <= 20 characters
-    - Website is optional but if provided must be <= 200 characters
+    - Website is optional but if provided must be an http(s) URL <= 200 characters
     - Social media URL is optional but if provided must be <= 50 characters
 
 
@@ -55,53 +68,54 @@ class Restaurant:
         """Validate data immediately after object creation."""
         self._validate()
 
-    def _validate(self):
+    def _validate(self, _VE=ValidationError, _isinstance=isinstance,
+                  _len=len, _strip=str.strip):
         """
         Validate all fields according to domain rules.
         Raises ValidationError if any validation rule is violated".
+        The keyword defaults bind hot globals as fast locals; callers
+        never pass them.
         """
 
-        if not self.name or not self.name.strip():
-            raise ValidationError("Restaurant name is required.")
-        if len(self.name) > 100:
-            raise ValidationError("Restaurant name must not exceed 100 chars.")
-
-        if not self.location or not self.location.strip():
-            raise ValidationError("Location is required.")
-        if len(self.location) > 150:
-            raise ValidationError("Location must not exceed 150 chars.")
-
-        if not self.country or not self.country.strip():
-            raise ValidationError("Country is required.")
-        if len(self.country) > 100:
-            raise ValidationError("Country must not exceed 100 chars.")
-
-        if not isinstance(self.price_range, int):
-            raise ValidationError("Price range must be an integer.")
-        if self.price_range not in [1, 2, 3, 4]:
-            raise ValidationError("Price range must be between 1 and 4.")
-
-        if self.cuisine_type and len(self.cuisine_type) > 50:
-            raise ValidationError("Cuisine type must not exceed 50 chars.")
-        if self.phone and len(self.phone) > 20:
-            raise ValidationError("Phone number must not exceed 20 chars.")
-        if self.website and len(self.website) > 200:
-            raise ValidationError("Website URL must not exceed 200 chars.")
-        if self.social_media and len(self.social_media) > 200:
-            raise ValidationError("Social media URL must not exceed 50 chars.")
-
-        # Strip whitespace from string fields
-        self.name = self.name.strip()
-        self.location = self.location.strip()
-        self.country = self.country.strip()
-        if self.cuisine_type:
-            self.cuisine_type = self.cuisine_type.strip()
-        if self.phone:
-            self.phone = self.phone.strip()
-        if self.website:
-            self.website = self.website.strip()
-        if self.social_media:
-            self.social_media = self.social_media.strip()
+        for attr, label, required, max_length in _TEXT_FIELDS:
+            value = getattr(self, attr)
+            # isspace() tests blankness without allocating a stripped copy
+            if required and (not value or value.isspace()):
+                raise _VE(f"{label} is required.")
+            if not value:
+                continue
+
+            stripped = _strip(value)
+            if _len(stripped) > max_length:
+                raise _VE(f"{label} must not exceed {max_length} chars.")
+
+            # Strip whitespace from string fields
+            setattr(self, attr, stripped)
+
+        # Cheap structural check rather than a full URL pattern
+        if self.website and not self.website.startswith(("http://", "https://")):
+            raise _VE("Website must be an http(s) URL.")
+
+        if not _isinstance(self.price_range, int):
+            raise _VE("Price range must be an integer.")
+        if not 1 <= self.price_range <= 4:
+            raise _VE("Price range must be between 1 and 4.")
+
+    @classmethod
+    def from_tuple(cls, t) -> "Restaurant":
+        """
+        Build a Restaurant from a plain row tuple in table column order
+        (id, name, location, country, cuisine_type, price_range, phone,
+        website, social_media), without re-validating.
+        """
+        obj = cls.__new__(cls)
+        (obj.id, obj.name, obj.location, obj.country, obj.cuisine_type,
+         obj.price_range, obj.phone, obj.website, obj.social_media) = t
+        # Few distinct countries and cuisines, so share one string per value
+        obj.country = sys.intern(obj.country)
+        if obj.cuisine_type:
+            obj.cuisine_type = sys.intern(obj.cuisine_type)
+        return obj
 
     def get_price_symbol(self) -> str:
         """Returns a string os euro symbols (€, €€, etc.)
@@ -3,13 +3,52 @@ Visit domain model
 Represents a visit to a restaurant with review details.
 """
 
+import sys
 from dataclasses import dataclass
 from datetime import date
+from math import isfinite
+from time import monotonic
 from typing import Optional
 from exceptions import ValidationError
 
+# Valid meal types, plus the same list as shown in error messages
+_MEAL_TYPES = frozenset({'breakfast', 'lunch', 'dinner', 'brunch', 'other'})
+_MEAL_TYPES_TEXT = "breakfast, lunch, dinner, brunch, other"
 
-@dataclass
+# Common spellings mapped straight to the canonical lowercase token
+_MEAL_CANON = {
+    variant: meal
+    for meal in _MEAL_TYPES
+    for variant in (meal, meal.upper(), meal.title())
+}
+
+# (attribute, label, max length) for each optional text field,
+# checked in order by Visit._validate
+_TEXT_FIELDS = (
+    ("dishes_ordered", "Dishes ordered", 500),
+    ("recommended_dishes", "Recommended dishes", 500),
+    ("beverage_ordered", "Beverage ordered", 500),
+    ("notes", "Notes", 1000),
+)
+
+# Star strings for every rating, built once instead of per call
+_STARS = tuple("★" * n + "☆" * (5 - n) for n in range(6))
+
+# Today's date, refreshed at most once a second during bulk construction
+_TODAY_TTL = 1.0
+_TODAY_CACHE = {"d": None, "t": 0.0}
+
+
+def _today() -> date:
+    """Return date.today(), reusing a recent value within the TTL."""
+    now = monotonic()
+    if _TODAY_CACHE["d"] is None or now - _TODAY_CACHE["t"] >= _TODAY_TTL:
+        _TODAY_CACHE["d"] = date.today()
+        _TODAY_CACHE["t"] = now
+    return _TODAY_CACHE["d"]
+
+
+@dataclass(slots=True)
 class Visit:
     """
     Represents a visit to a restaurant.
@@ -60,92 +99,99 @@ class Visit:
         """Validate data immediately after object creation."""
         self._validate()
 
-    def _validate(self):
+    def _validate(self, _VE=ValidationError, _isinstance=isinstance,
+                  _len=len, _strip=str.strip, _float=float):
         """
         Validates the visit data according to domain rules.
         Raises ValidationError if any validation rule is violated.
+        (Extra parameters only alias builtins for local lookup.)
         """
 
-        if not isinstance(self.restaurant_id, int) or self.restaurant_id <= 0:
-            raise ValidationError("Valid restaurant ID is required.")
-
-        if not isinstance(self.visit_date, date):
-            raise ValidationError("Visit date must be a valid date.")
-        if self.visit_date > date.today():
-            raise ValidationError("Visit date cannot be in the future.")
-
-        if not isinstance(self.rating, int):
-            raise ValidationError("Rating must be an integer")
-        if self.rating not in [1, 2, 3, 4, 5]:
-            raise ValidationError("Rating must be between 1 and 5.")
-
-        valid_meal_types = ['breakfast', 'lunch', 'dinner', 'brunch', 'other']
-        if not self.meal_type or not isinstance(self.meal_type, str):
-            raise ValidationError("Meal type is required.")
-        if self.meal_type.lower() not in valid_meal_types:
-            raise ValidationError(f"Meal type must be one of: {
-                ', '.join(valid_meal_types)
-                }.")
-
-        if self.service_rating is not None:
-            if not isinstance(self.service_rating, int):
-                raise ValidationError("Service rating must be an integer.")
-            if self.service_rating not in [1, 2, 3, 4, 5]:
-                raise ValidationError("Service rating must be\
-                                    between 1 and 5.")
-
-        if self.dishes_ordered:
-            if not isinstance(self.dishes_ordered, str):
-                raise ValidationError("Dishes ordered must be a string.")
-            if len(self.dishes_ordered) > 500:
-                raise ValidationError("Dishes ordered must not\
-                                    exceed 500 chars.")
-            self.dishes_ordered = self.dishes_ordered.strip()
-
-        if self.recommended_dishes:
-            if not isinstance(self.recommended_dishes, str):
-                raise ValidationError("Recommended dishes must be a string.")
-            if len(self.recommended_dishes) > 500:
-                raise ValidationError("Recommended dishes must not\
-                                    exceed 500 chars.")
-            self.recommended_dishes = self.recommended_dishes.strip()
-
-        if self.beverage_ordered:
-            if not isinstance(self.beverage_ordered, str):
-                raise ValidationError("Beverage ordered must be a string.")
-            if len(self.beverage_ordered) > 500:
-                raise ValidationError("Beverage ordered must not\
-                                    exceed 500 chars.")
-            self.beverage_ordered = self.beverage_ordered.strip()
+        if not (type(self.restaurant_id) is int and self.restaurant_id > 0):
+            raise _VE("Valid restaurant ID is required.")
+
+        if not _isinstance(self.visit_date, date):
+            raise _VE("Visit date must be a valid date.")
+        if self.visit_date > _today():
+            raise _VE("Visit date cannot be in the future.")
+
+        if type(self.rating) is not int:
+            raise _VE("Rating must be an integer")
+        if not 1 <= self.rating <= 5:
+            raise _VE("Rating must be between 1 and 5.")
+
+        if not self.meal_type or not _isinstance(self.meal_type, str):
+            raise _VE("Meal type is required.")
+        # Normalize meal_type once; stored lowercase for consistency.
+        # Usual spellings resolve without building a lowercased copy.
+        meal_type = _strip(self.meal_type)
+        canon = _MEAL_CANON.get(meal_type)
+        if canon is None:
+            canon = _MEAL_CANON.get(meal_type.lower())
+            if canon is None:
+                raise _VE(f"Meal type must be one of: {_MEAL_TYPES_TEXT}.")
+        self.meal_type = canon
+
+        service_rating = self.service_rating
+        if service_rating is not None:
+            if type(service_rating) is not int:
+                raise _VE("Service rating must be an integer.")
+            if not 1 <= service_rating <= 5:
+                raise _VE("Service rating must be between 1 and 5.")
+
+        for attr, label, max_length in _TEXT_FIELDS:
+            value = getattr(self, attr)
+            if value is None:
+                continue
+            if not _isinstance(value, str):
+                raise _VE(f"{label} must be a string.")
+            value = _strip(value)
+            if _len(value) > max_length:
+                raise _VE(f"{label} must not exceed {max_length} chars.")
+            setattr(self, attr, value)
 
         if self.total_cost is not None:
-            if not isinstance(self.total_cost, (int, float)):
-                raise ValidationError("Total cost must be a number.")
-            if self.total_cost < 0:
-                raise ValidationError("Total cost cannot be negative.")
-
-        if self.notes is not None:
-            if not isinstance(self.notes, str):
-                raise ValidationError("Notes must be a string.")
-            if len(self.notes) > 1000:
-                raise ValidationError("Notes must not exceed 1000 chars.")
-            self.notes = self.notes.strip()
-
-        if not isinstance(self.would_return, bool):
-            raise ValidationError("Would return must be True or False.")
-
-        # Normalize meals_type to lowercase for consistency
-        self.meal_type = self.meal_type.lower().strip()
+            # Convert once; also stores every cost as a float
+            try:
+                total_cost = _float(self.total_cost)
+            except (TypeError, ValueError):
+                raise _VE("Total cost must be a number.") from None
+            if not isfinite(total_cost):
+                raise _VE("Total cost must be a number.")
+            if total_cost < 0:
+                raise _VE("Total cost cannot be negative.")
+            self.total_cost = total_cost
+
+        if not _isinstance(self.would_return, bool):
+            raise _VE("Would return must be True or False.")
+
+    @classmethod
+    def from_tuple(cls, t) -> "Visit":
+        """
+        Build a Visit from a plain row tuple in table column order
+        (id, restaurant_id, visit_date, rating, meal_type, service_rating,
+        dishes_ordered, recommended_dishes, beverage_ordered, total_cost,
+        notes, would_return), without re-validating. visit_date is stored
+        as a date ordinal.
+        """
+        obj = cls.__new__(cls)
+        (obj.id, obj.restaurant_id, visit_date, obj.rating, meal_type,
+         obj.service_rating, obj.dishes_ordered, obj.recommended_dishes,
+         obj.beverage_ordered, obj.total_cost, obj.notes, would_return) = t
+        obj.visit_date = date.fromordinal(visit_date)
+        obj.meal_type = sys.intern(meal_type)  # only five distinct values
+        obj.would_return = bool(would_return)
+        return obj
 
     def get_rating_stars(self) -> str:
         """Returns a string of star symbols (★) representing the rating."""
-        return "★" * self.rating + "☆" * (5 - self.rating)
+        return _STARS[self.rating]
 
     def get_service_rating_stars(self) -> str:
         """String of stars or "N/A" if not rated"""
         if self.service_rating is None:
             return "N/A"
-        return "★" * self.service_rating + "☆" * (5 - self.service_rating)
+        return _STARS[self.service_rating]
 
     def get_formatted_date(self) -> str:
         """Returns the visit date formatted as 'Month Year'."""
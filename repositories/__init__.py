@@ -1,6 +1,7 @@
 """Repository layer for Bite Tracker."""
 
 from .base import RestaurantRepository, VisitRepository
+from .connection import connect, connect_in_memory
 from .restaurant_repository import SqliteRestaurantRepository
 from .visit_repository import SqliteVisitRepository
 
@@ -8,5 +9,7 @@ __all__ = [
     'RestaurantRepository',
     'VisitRepository',
     'SqliteRestaurantRepository',
-    'SqliteVisitRepository'
+    'SqliteVisitRepository',
+    'connect',
+    'connect_in_memory'
 ]
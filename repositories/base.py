@@ -1,152 +1,263 @@
 """
-Abstract base class for repositories.
-Defines the interface for repository implementations.
-Allows service layers t depend on abstractions rather
+Repository interfaces.
+Defines the interface for repository implementations as Protocols.
+Allows service layers to depend on abstractions rather
 than concrete implementations.
 """
 
-from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import ContextManager, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
 from models import Restaurant, Visit
 
 
-class RestaurantRepository(ABC):
+class RestaurantRepository(Protocol):
     """
-    Abstract base class for restaurant data access
+    Interface for restaurant data access
     Defines the interface for repository implementations.
     """
 
-    @abstractmethod
+    def transaction(self) -> ContextManager[None]:
+        """
+        Run the enclosed operations atomically; nested use joins the outer one.
+        Raises: RepositoryError: If the transaction cannot begin or commit
+        """
+        ...
+
     def add(self, restaurant: Restaurant) -> Restaurant:
         """
         Add a new restaurant to the data store.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
+
+    def add_raw(self, fields: tuple) -> int:
+        """
+        Add an unvalidated restaurant row given in column order; returns its ID.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
+
+    def add_many(self, restaurants: Iterable[Restaurant]) -> List[Restaurant]:
+        """
+        Add several restaurants atomically.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
 
-    @abstractmethod
     def get_by_id(self, restaurant_id: int) -> Optional[Restaurant]:
         """
         Retrieve a restaurant by its ID.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
+
+    def iter_all(self) -> Iterator[Restaurant]:
+        """
+        Stream all restaurants one at a time.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
 
-    @abstractmethod
     def get_all(self) -> List[Restaurant]:
         """
         Retrieve all restaurants.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
 
-    @abstractmethod
     def update(self, restaurant: Restaurant) -> bool:
         """
         Update an existing restaurant.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
+
+    def update_fields(self, restaurant_id: int, fields: Dict[str, object]) -> bool:
+        """
+        Update only the given columns of a restaurant.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
 
-    @abstractmethod
     def delete(self, restaurant_id: int) -> bool:
         """
         Delete a restaurant by ID.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
+
+    def delete_if_no_visit(self, restaurant_id: int) -> bool:
+        """
+        Delete a restaurant only if it has no visit; False if nothing was deleted.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
+
+    def get_by_ids(self, restaurant_ids: Iterable[int]) -> Dict[int, Restaurant]:
+        """
+        Retrieve several restaurants by ID, keyed by ID.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
+
+    def delete_many(self, restaurant_ids: Iterable[int]) -> int:
+        """
+        Delete several restaurants by ID; returns how many were deleted.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
+
+    def get_all_with_visits(self) -> List[Tuple[Restaurant, Optional[Visit]]]:
+        """
+        Retrieve all restaurants, each paired with its visit or None.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
+
+    def list_display_strings(self) -> List[Tuple[int, str]]:
+        """
+        Retrieve (id, display text) pairs for all restaurants.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
+
+    def get_with_visit(self, restaurant_id: int) -> Optional[Tuple[Restaurant, Optional[Visit]]]:
+        """
+        Retrieve a restaurant and its visit (or None) together; None if not found.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
 
-    @abstractmethod
     def search_by_name(self, name: str) -> List[Restaurant]:
         """
         Search for restaurants by partial name match.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
 
-    @abstractmethod
     def filter_by_country(self, country: str) -> List[Restaurant]:
         """
         Filter restaurants by country.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
 
 
-class VisitRepository(ABC):
+class VisitRepository(Protocol):
     """
-    Abstract base class for visit data access
+    Interface for visit data access
     Defines the interface for repository implementations.
     """
 
-    @abstractmethod
+    def transaction(self) -> ContextManager[None]:
+        """
+        Run the enclosed operations atomically; nested use joins the outer one.
+        Raises: RepositoryError: If the transaction cannot begin or commit
+        """
+        ...
+
     def add(self, visit: Visit) -> Visit:
         """
         Add a new visit to the data store.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
+
+    def add_if_absent(self, visit: Visit) -> Optional[Visit]:
+        """
+        Add a visit unless its restaurant already has one.
+        Returns the stored visit, or None if one already existed.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
+
+    def add_raw(self, fields: tuple) -> int:
+        """
+        Add an unvalidated visit row given in column order; returns its ID.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
+
+    def add_many(self, visits: Iterable[Visit]) -> List[Visit]:
+        """
+        Add several visits atomically.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
 
-    @abstractmethod
     def get_by_id(self, visit_id: int) -> Optional[Visit]:
         """
         Retrieve a visit by its ID.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
 
-    @abstractmethod
     def get_by_restaurant_id(self, restaurant_id: int) -> Optional[Visit]:
         """
         Retrieve the visit for a specific restaurant.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
+
+    def iter_all(self) -> Iterator[Visit]:
+        """
+        Stream all visits one at a time.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
 
-    @abstractmethod
     def get_all(self) -> List[Visit]:
         """
         Retrieve all visits.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
 
-    @abstractmethod
     def update(self, visit: Visit) -> bool:
         """
         Update an existing visit.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
+
+    def update_fields(self, visit_id: int, fields: Dict[str, object]) -> bool:
+        """
+        Update only the given columns of a visit.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
 
-    @abstractmethod
     def delete(self, visit_id: int) -> bool:
         """
         Delete a visit by ID.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
 
-    @abstractmethod
     def delete_by_restaurant_id(self, restaurant_id: int) -> bool:
         """
         Delete the visit associated with a restaurant.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
 
-    @abstractmethod
     def filter_by_meal_type(self, meal_type: str) -> List[Visit]:
         """
         Filter visits by meal type.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
+
+    def filter_by_rating(self, min_rating: int, limit: Optional[int] = None) -> List[Visit]:
+        """
+        Filter visits by minimum rating, newest first. With a limit, return
+        only the top limit visits, highest rated first.
+        Raises: RepositoryError: If the operation fails
+        """
+        ...
 
-    @abstractmethod
-    def filter_by_rating(self, min_rating: int) -> List[Visit]:
+    def get_visit_counts_by_restaurant(self) -> Dict[int, int]:
         """
-        Filter visits by minimum rating.
+        Count visits per restaurant ID.
         Raises: RepositoryError: If the operation fails
         """
-        pass
+        ...
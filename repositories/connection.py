@@ -0,0 +1,161 @@
+"""
+SQLite connection factory shared by the repositories.
+Opens connections with the tuned PRAGMA set applied once, so
+individual repository methods never need to issue PRAGMAs.
+"""
+
+import functools
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+from exceptions import DuplicateEntryError, RepositoryError
+
+DEFAULT_DB_PATH = "data/bite_tracker.db"
+MEMORY_DB_PATH = ":memory:"
+
+# INSERT ... RETURNING, used by the add paths, needs SQLite 3.35
+_MIN_SQLITE_VERSION = (3, 35, 0)
+
+# Applied to every connection when it is opened. journal_mode is stored
+# in the database file; the rest are per-connection settings.
+_PRAGMAS = """
+    PRAGMA journal_mode = WAL;
+    PRAGMA synchronous = NORMAL;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA cache_size = -64000;
+    PRAGMA busy_timeout = 5000;
+    PRAGMA foreign_keys = ON;
+"""
+
+
+class SharedConnection(sqlite3.Connection):
+    """
+    Connection shared by several repositories.
+    Carries the lock they all hold while using it, so access from
+    different threads stays serialized across repositories.
+    """
+
+    # Set once the schema has been checked on this connection
+    schema_ready = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.RLock()
+
+    def close(self):
+        """
+        Let SQLite refresh its query planner statistics, then close.
+        A failed optimize never prevents the connection from closing.
+        """
+        try:
+            self.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+        super().close()
+
+
+def connect(db_path: str = DEFAULT_DB_PATH) -> SharedConnection:
+    """
+    Open an autocommit connection with tuned PRAGMAs.
+    Rows come back as plain tuples in column order.
+    Creates the database directory if needed.
+    Raises: RepositoryError: If the database cannot be opened or the
+    SQLite library is too old.
+    """
+    if sqlite3.sqlite_version_info < _MIN_SQLITE_VERSION:
+        raise RepositoryError(
+            f"SQLite {sqlite3.sqlite_version} is too old; "
+            f"version {'.'.join(map(str, _MIN_SQLITE_VERSION))} or newer is required"
+        )
+
+    try:
+        # Create data directory if it doesn't exist
+        if db_path != MEMORY_DB_PATH:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        # Connect to database (creates file if doesn't exist)
+        # cached_statements sizes the per-connection prepared statement cache
+        conn = sqlite3.connect(
+            db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256,
+            factory=SharedConnection,
+        )
+        conn.executescript(_PRAGMAS)
+        return conn
+
+    except sqlite3.Error as e:
+        raise RepositoryError(f"Failed to open database: {e}")
+
+
+def connect_in_memory() -> SharedConnection:
+    """
+    Open a private in-memory database, e.g. for tests or seed fixtures.
+    Nothing touches the disk. Pass the same connection to every repository
+    that should see the same data.
+    Raises: RepositoryError: If the database cannot be opened.
+    """
+    return connect(MEMORY_DB_PATH)
+
+
+def sql_operation(action: str, integrity_detail: Optional[str] = None):
+    """
+    Decorate a repository method so SQLite errors surface as RepositoryError
+    with the message "Failed to <action>: <error>". UNIQUE violations raise
+    DuplicateEntryError; integrity_detail, when given, is added to the
+    message for other constraint violations.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            except sqlite3.IntegrityError as e:
+                if str(e).startswith("UNIQUE constraint failed"):
+                    raise DuplicateEntryError(f"Failed to {action}: {e}") from e
+                if integrity_detail:
+                    raise RepositoryError(
+                        f"Failed to {action}: {integrity_detail} ({e})"
+                    ) from e
+                raise RepositoryError(f"Failed to {action}: {e}") from e
+            except sqlite3.Error as e:
+                raise RepositoryError(f"Failed to {action}: {e}") from e
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def immediate_transaction(conn: sqlite3.Connection, lock):
+    """
+    Group the enclosed operations into one BEGIN IMMEDIATE transaction
+    on an autocommit connection, holding lock throughout.
+    Commits on success and rolls back on any exception. Nested use
+    joins the outer transaction rather than starting a new one.
+    Raises: RepositoryError: If the transaction cannot begin or commit.
+    """
+    with lock:
+        if conn.in_transaction:
+            yield
+            return
+
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            raise RepositoryError(f"Failed to begin transaction: {e}")
+
+        try:
+            yield
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+        try:
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise RepositoryError(f"Failed to commit transaction: {e}")
@@ -4,81 +4,154 @@ Handles all restaurant data persistence using SQLite database.
 """
 
 import sqlite3
-from pathlib import Path
-from typing import List, Optional
-from models import Restaurant
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from models import Restaurant, Visit
 from exceptions import RepositoryError
-from repositories.base import RestaurantRepository
+from repositories.connection import immediate_transaction, sql_operation
+from repositories.schema import ensure_schema, has_name_search_index
+
+# Rows pulled per fetch when streaming results
+_FETCH_BATCH = 256
+
+# Columns in the order Restaurant.from_tuple expects. Selects name them
+# explicitly so row layout never depends on the table definition.
+_COLUMNS = (
+    "id, name, location, country, cuisine_type, "
+    "price_range, phone, website, social_media"
+)
+_COL_ID = 0
+_NUM_COLUMNS = 9
+
+# Statements are module constants so the connection's statement cache
+# reuses one prepared statement per query
+_SQL_INSERT = f"""
+    INSERT INTO restaurants (
+        name, location, country, cuisine_type,
+        price_range, phone, website, social_media
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    RETURNING {_COLUMNS}
+"""
+_SQL_INSERT_RAW = """
+    INSERT INTO restaurants (
+        name, location, country, cuisine_type,
+        price_range, phone, website, social_media
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_SELECT_BY_ID = f"SELECT {_COLUMNS} FROM restaurants WHERE id = ?"
+_SQL_SELECT_ALL = f"SELECT {_COLUMNS} FROM restaurants ORDER BY name COLLATE NOCASE"
+_SQL_UPDATE = """
+    UPDATE restaurants
+    SET name = ?, location = ?, country = ?, cuisine_type = ?,
+        price_range = ?, phone = ?, website = ?, social_media = ?
+    WHERE id = ?
+"""
+# Columns update_fields may set, in table order
+_UPDATABLE_COLUMNS = (
+    "name", "location", "country", "cuisine_type",
+    "price_range", "phone", "website", "social_media",
+)
+_SQL_DELETE = "DELETE FROM restaurants WHERE id = ?"
+_SQL_DELETE_IF_NO_VISIT = """
+    DELETE FROM restaurants
+    WHERE id = ? AND NOT EXISTS (SELECT 1 FROM visits WHERE restaurant_id = ?)
+"""
+_SQL_SELECT_WITH_VISITS = """
+    SELECT r.id, r.name, r.location, r.country, r.cuisine_type,
+           r.price_range, r.phone, r.website, r.social_media,
+           v.id, v.restaurant_id, v.visit_date, v.rating, v.meal_type,
+           v.service_rating, v.dishes_ordered, v.recommended_dishes,
+           v.beverage_ordered, v.total_cost, v.notes, v.would_return
+    FROM restaurants r
+    LEFT JOIN visits v ON v.restaurant_id = r.id
+"""
+_SQL_SELECT_ALL_WITH_VISITS = _SQL_SELECT_WITH_VISITS + "ORDER BY r.name COLLATE NOCASE"
+_SQL_SELECT_WITH_VISIT_BY_ID = _SQL_SELECT_WITH_VISITS + "WHERE r.id = ?"
+# Builds the listing text in SQL: the Restaurant.__str__ summary line
+# followed by any contact lines, exactly as the CLI prints them
+_SQL_SELECT_DISPLAY_STRINGS = """
+    SELECT id,
+           name || COALESCE(' (' || NULLIF(cuisine_type, '') || ')', '')
+           || ' - ' || location || ', ' || country
+           || ' - ' || substr('€€€€', 1, price_range)
+           || COALESCE(char(10) || '   Phone: ' || NULLIF(phone, ''), '')
+           || COALESCE(char(10) || '   Website: ' || NULLIF(website, ''), '')
+           || COALESCE(char(10) || '   Social: ' || NULLIF(social_media, ''), '')
+    FROM restaurants
+    ORDER BY name COLLATE NOCASE
+"""
+_SQL_SEARCH_BY_NAME = f"SELECT {_COLUMNS} FROM restaurants WHERE LOWER(name) like ? ORDER BY name COLLATE NOCASE"
+# Same search through the trigram index; its LIKE is case-insensitive
+_SQL_SEARCH_BY_NAME_FTS = f"""
+    SELECT {_COLUMNS} FROM restaurants
+    WHERE id IN (SELECT rowid FROM restaurants_fts WHERE name LIKE ?)
+    ORDER BY name COLLATE NOCASE
+"""
+_SQL_FILTER_BY_COUNTRY = f"SELECT {_COLUMNS} FROM restaurants WHERE country = ? COLLATE NOCASE ORDER BY name COLLATE NOCASE"
 
 
-class SqliteRestaurantRepository(RestaurantRepository):
+class SqliteRestaurantRepository:
     """SQLite implementation of restaurant data access."""
 
-    def __init__(self, db_path: str = "data/bite_tracker.db"):
-        """Initialize repository and ensure database exists."""
-        self.db_path = db_path
-        self._ensure_database_exists()
-
-    def _ensure_database_exists(self):
-        """ Create database file and restaurant table if they don't exist. """
-        try:
-            # Create data directory if it doesn't exist
-            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-
-            # Connect to database (creates file if doesn't exist)
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Create restaurants table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS restaurants (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    location TEXT NOT NULL,
-                    country TEXT NOT NULL,
-                    cuisine_type TEXT,
-                    price_range INTEGER NOT NULL,
-                    phone TEXT,
-                    website TEXT,
-                    social_media TEXT
-                )
-            """)
-
-            conn.commit()
-            conn.close()
+    def __init__(self, conn: sqlite3.Connection):
+        """
+        Initialize repository on a connection and ensure the schema exists.
+        The connection may be shared with other repositories; it is owned
+        and closed by the caller.
+        """
+        self._conn = conn
+        # Serialize use of the connection across threads; a SharedConnection
+        # carries one lock for all repositories that use it
+        lock = getattr(conn, "lock", None)
+        self._lock = lock if lock is not None else threading.RLock()
+        with self._lock:
+            ensure_schema(conn)
+            self._search_sql = (
+                _SQL_SEARCH_BY_NAME_FTS if has_name_search_index(conn)
+                else _SQL_SEARCH_BY_NAME
+            )
 
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to initialize database: {e}")
+    @contextmanager
+    def _cursor(self):
+        """Yield a cursor on the shared connection while holding the lock."""
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    def transaction(self):
+        """
+        Group the enclosed operations into one BEGIN IMMEDIATE transaction.
+        Commits on success and rolls back on any exception. Nested use
+        joins the outer transaction rather than starting a new one.
+        Raises: RepositoryError: If the transaction cannot begin or commit.
+        """
+        return immediate_transaction(self._conn, self._lock)
 
-    def _row_to_restaurant(self, row: sqlite3.Row) -> Restaurant:
+    def _row_to_restaurant(self, row: tuple) -> Restaurant:
         """ Convert a database row to a Restaurant object. """
-        return Restaurant(
-            id=row['id'],
-            name=row['name'],
-            location=row['location'],
-            country=row['country'],
-            cuisine_type=row['cuisine_type'],
-            price_range=row['price_range'],
-            phone=row['phone'],
-            website=row['website'],
-            social_media=row['social_media']
+        # Stored rows were validated on the way in
+        return Restaurant.from_tuple(row)
+
+    def _row_to_restaurant_with_visit(self, row: tuple) -> Tuple[Restaurant, Optional[Visit]]:
+        """ Split a restaurant/visit join row; the visit is None if unvisited. """
+        return (
+            Restaurant.from_tuple(row[:_NUM_COLUMNS]),
+            Visit.from_tuple(row[_NUM_COLUMNS:])
+            if row[_NUM_COLUMNS] is not None else None,
         )
 
+    @sql_operation("add restaurant")
     def add(self, restaurant: Restaurant) -> Restaurant:
         """
         Add a new restaurant to the database
         Raises: RepositoryError: If database operation fails.
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                INSERT INTO restaurants (
-                        name, location, country, cuisine_type,
-                    price_range, phone, website, social_media
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_INSERT, (
                 restaurant.name,
                 restaurant.location,
                 restaurant.country,
@@ -89,89 +162,97 @@ class SqliteRestaurantRepository(RestaurantRepository):
                 restaurant.social_media
             ))
 
-            # Get the auto-generated ID
-            restaurant_id = cursor.lastrowid
-
-            conn.commit()
-            conn.close()
-
-            # Return a new Restaurant object with the ID set
-            return Restaurant(
-                id=restaurant_id,
-                name=restaurant.name,
-                location=restaurant.location,
-                country=restaurant.country,
-                cuisine_type=restaurant.cuisine_type,
-                price_range=restaurant.price_range,
-                phone=restaurant.phone,
-                website=restaurant.website,
-                social_media=restaurant.social_media
-            )
+            # RETURNING hands back the stored row, ID included
+            return self._row_to_restaurant(cursor.fetchone())
 
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to add restaurant: {e}")
+    @sql_operation("add restaurant")
+    def add_raw(self, fields: tuple) -> int:
+        """
+        Insert one restaurant from a plain tuple and return its new ID.
+        Fields follow the INSERT column order (name, location, country,
+        cuisine_type, price_range, phone, website, social_media) and
+        skip model validation, so callers such as import scripts must
+        pass clean values; the table's CHECK constraints still apply.
+        Raises: RepositoryError: If database operation fails.
+        """
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_INSERT_RAW, fields)
+            return cursor.lastrowid
 
+    @sql_operation("add restaurants")
+    def add_many(self, restaurants: Iterable[Restaurant]) -> List[Restaurant]:
+        """
+        Add several restaurants in a single transaction.
+        Either all rows are inserted or none are.
+        Raises: RepositoryError: If database operation fails.
+        """
+        with self.transaction(), self._cursor() as cursor:
+            added = []
+            for r in restaurants:
+                cursor.execute(_SQL_INSERT, (
+                    r.name, r.location, r.country, r.cuisine_type,
+                    r.price_range, r.phone, r.website, r.social_media
+                ))
+                added.append(self._row_to_restaurant(cursor.fetchone()))
+
+        return added
+
+    @sql_operation("get restaurant by ID")
     def get_by_id(self, restaurant_id: int) -> Optional[Restaurant]:
         """
         Retrieve a restaurant by its ID.
         Raises: RepositoryError: If database operation fails.
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row  # Enable named column access
-            cursor = conn.cursor()
-
-            cursor.execute(
-                "SELECT * FROM restaurants WHERE id = ?",
-                (restaurant_id,)
-            )
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_SELECT_BY_ID, (restaurant_id,))
             row = cursor.fetchone()
 
-            conn.close()
-
             if row is None:
                 return None
 
             return self._row_to_restaurant(row)
 
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to get restaurant by ID: {e}")
-
-    def get_all(self) -> List[Restaurant]:
+    def iter_all(self) -> Iterator[Restaurant]:
         """
-        Retrieve all restaurants.
+        Yield all restaurants in name order without building a list.
+        Rows are fetched in batches and the lock is held only per batch.
         Raises: RepositoryError: If database operation fails.
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT * FROM restaurants ORDER BY name")
-            rows = cursor.fetchall()
-
-            conn.close()
-
-            return [self._row_to_restaurant(row) for row in rows]
+            cursor = self._conn.cursor()
+            try:
+                cursor.arraysize = _FETCH_BATCH
+                with self._lock:
+                    cursor.execute(_SQL_SELECT_ALL)
+                from_tuple = Restaurant.from_tuple
+                while True:
+                    with self._lock:
+                        rows = cursor.fetchmany()
+                    if not rows:
+                        return
+                    for row in rows:
+                        yield from_tuple(row)
+            finally:
+                cursor.close()
 
         except sqlite3.Error as e:
             raise RepositoryError(f"Failed to get all restaurants: {e}")
 
+    def get_all(self) -> List[Restaurant]:
+        """
+        Retrieve all restaurants.
+        Raises: RepositoryError: If database operation fails.
+        """
+        return list(self.iter_all())
+
+    @sql_operation("update restaurant")
     def update(self, restaurant: Restaurant) -> bool:
         """
         Update an existing restaurant
         Raises: RepositoryError: If database operation fails.
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                UPDATE restaurants
-                SET name = ?, location = ?, country = ?, cuisine_type = ?,
-                    price_range = ?, phone = ?, website = ?, social_media = ?
-                WHERE id = ?
-            """, (
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_UPDATE, (
                 restaurant.name,
                 restaurant.location,
                 restaurant.country,
@@ -185,80 +266,156 @@ class SqliteRestaurantRepository(RestaurantRepository):
 
             rows_affected = cursor.rowcount
 
-            conn.commit()
-            conn.close()
-
             return rows_affected > 0
 
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to update restaurant: {e}")
+    @sql_operation("update restaurant")
+    def update_fields(self, restaurant_id: int, fields: Dict[str, object]) -> bool:
+        """
+        Update only the given columns of a restaurant.
+        Values must already be validated. Returns False if no
+        restaurant has the ID.
+        Raises: RepositoryError: If a column is unknown or the database operation fails.
+        """
+        unknown = fields.keys() - set(_UPDATABLE_COLUMNS)
+        if unknown:
+            raise RepositoryError(f"Cannot update restaurant columns: {', '.join(sorted(unknown))}")
+
+        # Table order keeps the statement text, and its cached prepared
+        # statement, the same for the same set of columns
+        columns = [c for c in _UPDATABLE_COLUMNS if c in fields]
+        if not columns:
+            return self.get_by_id(restaurant_id) is not None
+
+        assignments = ", ".join(f"{c} = ?" for c in columns)
+        with self._cursor() as cursor:
+            cursor.execute(
+                f"UPDATE restaurants SET {assignments} WHERE id = ?",
+                [fields[c] for c in columns] + [restaurant_id]
+            )
+            return cursor.rowcount > 0
 
+    @sql_operation("delete restaurant")
     def delete(self, restaurant_id: int) -> bool:
         """
         Delete a restaurant ID
         Raises: RepositoryError: If database operation fails.
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("DELETE FROM restaurants WHERE id = ?", (restaurant_id,))
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_DELETE, (restaurant_id,))
 
             rows_affected = cursor.rowcount
 
-            conn.commit()
-            conn.close()
-
             return rows_affected > 0
 
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to delete restaurant: {e}")
+    @sql_operation("delete restaurant")
+    def delete_if_no_visit(self, restaurant_id: int) -> bool:
+        """
+        Delete a restaurant only if it has no visit, in a single statement.
+        Returns False when nothing was deleted: the restaurant does not
+        exist or still has a visit.
+        Raises: RepositoryError: If database operation fails.
+        """
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_DELETE_IF_NO_VISIT, (restaurant_id, restaurant_id))
+            return cursor.rowcount > 0
 
-    def search_by_name(self, name: str) -> List[Restaurant]:
+    @sql_operation("get restaurants by ID")
+    def get_by_ids(self, restaurant_ids: Iterable[int]) -> Dict[int, Restaurant]:
         """
-        Search restaurants by partial name match.
+        Retrieve several restaurants in one query, keyed by ID.
+        IDs with no matching restaurant are simply absent from the result.
         Raises: RepositoryError: If database operation fails.
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+        ids = list(restaurant_ids)
+        if not ids:
+            return {}
+        placeholders = ",".join("?" * len(ids))
+        with self._cursor() as cursor:
+            cursor.execute(
+                f"SELECT {_COLUMNS} FROM restaurants WHERE id IN ({placeholders})", ids
+            )
+            return {row[_COL_ID]: self._row_to_restaurant(row) for row in cursor}
 
-            # Use LIKE with wildcards for partial matching
-            # LOWER() makes search case-insensitive
-            search_term = f"%{name.lower()}%"
+    @sql_operation("delete restaurants")
+    def delete_many(self, restaurant_ids: Iterable[int]) -> int:
+        """
+        Delete several restaurants with a single statement.
+        Returns the number of rows deleted.
+        Raises: RepositoryError: If database operation fails.
+        """
+        ids = list(restaurant_ids)
+        if not ids:
+            return 0
+        placeholders = ",".join("?" * len(ids))
+        with self._cursor() as cursor:
             cursor.execute(
-                "SELECT * FROM restaurants WHERE LOWER(name) like ? ORDER BY name", (search_term,)
+                f"DELETE FROM restaurants WHERE id IN ({placeholders})", ids
             )
-            rows = cursor.fetchall()
+            return cursor.rowcount
 
-            conn.close()
+    @sql_operation("get restaurants with visits")
+    def get_all_with_visits(self) -> List[Tuple[Restaurant, Optional[Visit]]]:
+        """
+        Retrieve every restaurant paired with its visit (or None),
+        using one LEFT JOIN instead of a visit lookup per restaurant.
+        Raises: RepositoryError: If database operation fails.
+        """
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_SELECT_ALL_WITH_VISITS)
+            return [self._row_to_restaurant_with_visit(row) for row in cursor]
 
-            return [self._row_to_restaurant(row) for row in rows]
+    @sql_operation("get restaurant with visit")
+    def get_with_visit(self, restaurant_id: int) -> Optional[Tuple[Restaurant, Optional[Visit]]]:
+        """
+        Retrieve a restaurant and its visit (or None) in one query.
+        Returns None if no restaurant has the ID.
+        Raises: RepositoryError: If database operation fails.
+        """
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_SELECT_WITH_VISIT_BY_ID, (restaurant_id,))
+            row = cursor.fetchone()
 
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to search restaurants by name: {e}")
+            if row is None:
+                return None
+
+            return self._row_to_restaurant_with_visit(row)
 
+    @sql_operation("list restaurants")
+    def list_display_strings(self) -> List[Tuple[int, str]]:
+        """
+        Retrieve (id, display text) pairs for every restaurant in name order.
+        The text is formatted by SQLite, so list views need no Restaurant objects.
+        Raises: RepositoryError: If database operation fails.
+        """
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_SELECT_DISPLAY_STRINGS)
+            return cursor.fetchall()
+
+    @sql_operation("search restaurants by name")
+    def search_by_name(self, name: str) -> List[Restaurant]:
+        """
+        Search restaurants by partial name match.
+        Raises: RepositoryError: If database operation fails.
+        """
+        with self._cursor() as cursor:
+            # Use LIKE with wildcards for partial matching; the trigram
+            # index serves it when present, else LOWER() on every name
+            search_term = f"%{name.lower()}%"
+            cursor.execute(self._search_sql, (search_term,))
+            rows = cursor.fetchall()
+
+            return [self._row_to_restaurant(row) for row in rows]
+
+    @sql_operation("filter restaurants by country")
     def filter_by_country(self, country: str) -> List[Restaurant]:
         """
         Filter restaurants by country.
         Raises: RepositoryError: If database operation fails
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            # Exact match but case-insensitive
-            cursor.execute(
-                "SELECT * FROM restaurants WHERE LOWER(country) = LOWER(?) ORDER BY name", (country,)
-            )
+        with self._cursor() as cursor:
+            # Exact match but case-insensitive (NOCASE lets SQLite use the country index)
+            cursor.execute(_SQL_FILTER_BY_COUNTRY, (country,))
 
             rows = cursor.fetchall()
 
-            conn.close()
-
             return [self._row_to_restaurant(row) for row in rows]
-
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to filter restaurants by country: {e}")
@@ -0,0 +1,211 @@
+"""
+Database schema bootstrap.
+Creates both tables and their indexes in one script, so a shared
+connection is set up once for every repository that uses it.
+"""
+
+import sqlite3
+from exceptions import RepositoryError
+from repositories.connection import SharedConnection
+
+# Stored in PRAGMA user_version once the script below has run.
+# Bump it whenever the script changes so existing databases pick it up.
+_SCHEMA_VERSION = 3
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS restaurants (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL CHECK (length(name) BETWEEN 1 AND 100),
+        location TEXT NOT NULL,
+        country TEXT NOT NULL,
+        cuisine_type TEXT,
+        price_range INTEGER NOT NULL
+            CHECK (price_range BETWEEN 1 AND 4),
+        phone TEXT,
+        website TEXT,
+        social_media TEXT
+    );
+
+    -- Indexes backing the case-insensitive country filter and name lookups
+    CREATE INDEX IF NOT EXISTS idx_restaurants_country
+    ON restaurants(country COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS idx_restaurants_name
+    ON restaurants(name COLLATE NOCASE);
+
+    CREATE TABLE IF NOT EXISTS visits (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        restaurant_id INTEGER NOT NULL,
+        visit_date INTEGER NOT NULL,  -- date.toordinal()
+        rating INTEGER NOT NULL,
+        meal_type TEXT NOT NULL,
+        service_rating INTEGER,
+        dishes_ordered TEXT,
+        recommended_dishes TEXT,
+        beverage_ordered TEXT,
+        total_cost REAL,
+        notes TEXT,
+        would_return INTEGER NOT NULL DEFAULT 1,
+        FOREIGN KEY (restaurant_id) REFERENCES restaurants(id)
+            ON DELETE CASCADE
+    );
+
+    -- Databases from before dates were stored as ordinals hold ISO
+    -- text; convert those rows in place (julianday of 0001-01-01
+    -- is 1721425.5, which is ordinal 1)
+    UPDATE visits
+    SET visit_date = CAST(julianday(visit_date) - 1721424.5 AS INTEGER)
+    WHERE typeof(visit_date) = 'text';
+
+    -- Indexes backing the rating and meal type filters
+    CREATE INDEX IF NOT EXISTS idx_visits_rating
+    ON visits(rating);
+    CREATE INDEX IF NOT EXISTS idx_visits_meal_type
+    ON visits(meal_type, visit_date);
+"""
+
+# Restaurants holding more than one visit, which the unique index rejects
+_SQL_DUPLICATE_VISITS = """
+    SELECT restaurant_id FROM visits
+    GROUP BY restaurant_id HAVING COUNT(*) > 1
+    ORDER BY restaurant_id
+"""
+
+# A restaurant has at most one visit; the unique index enforces it
+# and also serves per-restaurant lookups and the restaurant/visit join
+_UNIQUE_VISIT_INDEX = (
+    "DROP INDEX IF EXISTS idx_visits_restaurant_id",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_visits_restaurant_id ON visits(restaurant_id)",
+)
+
+# Trigram full-text index over restaurant names, kept in sync by triggers.
+# Substring LIKE searches on it use the index instead of scanning every
+# name. Optional: SQLite builds without FTS5 fall back to a plain LIKE.
+# Run statement by statement: executescript() would commit the migration
+# transaction before starting.
+_SEARCH_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS restaurants_fts USING fts5(
+        name,
+        content = 'restaurants',
+        content_rowid = 'id',
+        tokenize = 'trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS restaurants_fts_insert
+    AFTER INSERT ON restaurants BEGIN
+        INSERT INTO restaurants_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS restaurants_fts_delete
+    AFTER DELETE ON restaurants BEGIN
+        INSERT INTO restaurants_fts (restaurants_fts, rowid, name)
+        VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS restaurants_fts_update
+    AFTER UPDATE OF name ON restaurants BEGIN
+        INSERT INTO restaurants_fts (restaurants_fts, rowid, name)
+        VALUES ('delete', old.id, old.name);
+        INSERT INTO restaurants_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    # Index any restaurants that were stored before the table existed
+    "INSERT INTO restaurants_fts (restaurants_fts) VALUES ('rebuild')",
+)
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """
+    Create the restaurants and visits tables and indexes if missing.
+    Databases already at the current schema version are left alone, and
+    a SharedConnection is only checked once however many repositories use it.
+    The migration runs in one transaction, so a failure leaves an existing
+    database exactly as it was.
+    Raises: RepositoryError: If the schema cannot be created, or if a
+    restaurant has more than one visit and so cannot be migrated.
+    """
+    if getattr(conn, "schema_ready", False):
+        return
+
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < _SCHEMA_VERSION:
+            # The script opens the transaction itself, since executescript()
+            # commits any transaction already open. It stays open afterwards.
+            conn.executescript("BEGIN IMMEDIATE;" + _SCHEMA)
+            migrate = _migrate
+        elif not has_name_search_index(conn):
+            # Migrated by a SQLite build without FTS5; this one may have it
+            conn.execute("BEGIN IMMEDIATE")
+            migrate = _create_search_index
+        else:
+            migrate = None
+
+        if migrate is not None:
+            try:
+                migrate(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+    except sqlite3.Error as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise RepositoryError(f"Failed to initialize database: {e}")
+
+    if isinstance(conn, SharedConnection):
+        conn.schema_ready = True
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """
+    Finish the migration inside the transaction opened by ensure_schema:
+    the unique visit index, the search index and the schema version.
+    Raises: RepositoryError: If a restaurant has more than one visit.
+    """
+    duplicates = [row[0] for row in conn.execute(_SQL_DUPLICATE_VISITS)]
+    if duplicates:
+        ids = ", ".join(str(restaurant_id) for restaurant_id in duplicates)
+        raise RepositoryError(
+            f"Failed to initialize database: restaurants with more than one "
+            f"visit (IDs {ids}). Remove the extra visits from the database and restart."
+        )
+
+    for statement in _UNIQUE_VISIT_INDEX:
+        conn.execute(statement)
+
+    _create_search_index(conn)
+    conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+
+def _create_search_index(conn: sqlite3.Connection) -> None:
+    """
+    Create the full-text name index inside an open transaction.
+    Skipped without error when this SQLite build has no FTS5; the next
+    start checks for the index again.
+    """
+    conn.execute("SAVEPOINT search_schema")
+    try:
+        for statement in _SEARCH_SCHEMA:
+            conn.execute(statement)
+    except sqlite3.OperationalError:
+        conn.execute("ROLLBACK TO search_schema")
+    conn.execute("RELEASE search_schema")
+
+
+def has_name_search_index(conn: sqlite3.Connection) -> bool:
+    """
+    Report whether the full-text restaurant name index exists.
+    Raises: RepositoryError: If the schema cannot be read.
+    """
+    try:
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'restaurants_fts'"
+        ).fetchone()
+    except sqlite3.Error as e:
+        raise RepositoryError(f"Failed to initialize database: {e}")
+
+    return row is not None
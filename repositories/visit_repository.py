@@ -5,101 +5,141 @@ Manages the relationship between visits and restaurants.
 """
 
 import sqlite3
-from pathlib import Path
+import threading
+from contextlib import contextmanager
 from datetime import date
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from models import Visit
 from exceptions import RepositoryError
-from repositories.base import VisitRepository
+from repositories.connection import immediate_transaction, sql_operation
+from repositories.schema import ensure_schema
+
+# Rows pulled per fetch when streaming results
+_FETCH_BATCH = 256
+
+# Columns in the order Visit.from_tuple expects, named explicitly so
+# row layout never depends on the table definition
+_COLUMNS = (
+    "id, restaurant_id, visit_date, rating, meal_type, service_rating, "
+    "dishes_ordered, recommended_dishes, beverage_ordered, total_cost, "
+    "notes, would_return"
+)
+
+# Statements are module constants so the connection's statement cache
+# reuses one prepared statement per query
+_SQL_INSERT = f"""
+    INSERT INTO visits (
+        restaurant_id, visit_date, rating, meal_type,
+        service_rating, dishes_ordered, recommended_dishes,
+        beverage_ordered, total_cost, notes, would_return
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    RETURNING {_COLUMNS}
+"""
+# Same insert, but a restaurant that already has a visit yields no row
+_SQL_INSERT_IF_ABSENT = f"""
+    INSERT INTO visits (
+        restaurant_id, visit_date, rating, meal_type,
+        service_rating, dishes_ordered, recommended_dishes,
+        beverage_ordered, total_cost, notes, would_return
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(restaurant_id) DO NOTHING
+    RETURNING {_COLUMNS}
+"""
+_SQL_INSERT_RAW = """
+    INSERT INTO visits (
+        restaurant_id, visit_date, rating, meal_type,
+        service_rating, dishes_ordered, recommended_dishes,
+        beverage_ordered, total_cost, notes, would_return
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_SELECT_BY_ID = f"SELECT {_COLUMNS} FROM visits WHERE id = ?"
+_SQL_SELECT_BY_RESTAURANT = f"SELECT {_COLUMNS} FROM visits WHERE restaurant_id = ?"
+_SQL_SELECT_ALL = f"SELECT {_COLUMNS} FROM visits order by visit_date DESC"
+_SQL_UPDATE = """
+    UPDATE visits
+    SET restaurant_id = ?, visit_date = ?, rating = ?, meal_type = ?,
+        service_rating = ?, dishes_ordered = ?, recommended_dishes = ?,
+        beverage_ordered = ?, total_cost = ?, notes = ?, would_return = ?
+    WHERE id = ?
+"""
+# Columns update_fields may set, in table order, each with the conversion
+# from the model's value to the stored one
+_UPDATABLE_COLUMNS = {
+    "restaurant_id": None,
+    "visit_date": date.toordinal,
+    "rating": None,
+    "meal_type": None,
+    "service_rating": None,
+    "dishes_ordered": None,
+    "recommended_dishes": None,
+    "beverage_ordered": None,
+    "total_cost": None,
+    "notes": None,
+    "would_return": int,
+}
+_SQL_DELETE = "DELETE FROM visits WHERE id = ?"
+_SQL_DELETE_BY_RESTAURANT = "DELETE FROM visits WHERE restaurant_id = ?"
+_SQL_FILTER_BY_MEAL_TYPE = f"SELECT {_COLUMNS} FROM visits WHERE meal_type = ? ORDER BY visit_date DESC"
+_SQL_COUNT_BY_RESTAURANT = "SELECT restaurant_id, COUNT(*) FROM visits GROUP BY restaurant_id"
+_SQL_FILTER_BY_RATING = f"SELECT {_COLUMNS} FROM visits WHERE rating >= ? ORDER BY visit_date DESC"
+_SQL_TOP_BY_RATING = f"""
+    SELECT {_COLUMNS} FROM visits WHERE rating >= ?
+    ORDER BY rating DESC, visit_date DESC LIMIT ?
+"""
 
 
-class SqliteVisitRepository(VisitRepository):
+class SqliteVisitRepository:
     """SQlite implementation of visit data access.
     Creates and manages visit table in an SQLite database.
     Enforces foreign key relationship with restaurants table.
     """
 
-    def __init__(self, db_path: str = "data/bite_tracker.db"):
-        """Initialize repository and ensure database exists."""
-        self.db_path = db_path
-        self._ensure_database_exists()
-
-    def _ensure_database_exists(self):
-        """ Create visit table if it doesn't exist.
-        Enables foreign key constraints to maintain referential integrity.
+    def __init__(self, conn: sqlite3.Connection):
         """
-        try:
-            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Enable foreign key constraints
-            cursor.execute("PRAGMA foreign_keys = ON;")
-
-            # Create visits table with foreign key to restaurants
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS visits (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    restaurant_id INTEGER NOT NULL,
-                    visit_date DATE NOT NULL,
-                    rating INTEGER NOT NULL,
-                    meal_type TEXT NOT NULL,
-                    service_rating INTEGER,
-                    dishes_ordered TEXT,
-                    recommended_dishes TEXT,
-                    beverage_ordered TEXT,
-                    total_cost REAL,
-                    notes TEXT,
-                    would_return INTEGER NOT NULL DEFAULT 1,
-                    FOREIGN KEY (restaurant_id) REFERENCES restaurants(id)
-                        ON DELETE CASCADE
-                    )
-            """)
-
-            conn.commit()
-            conn.close()
-
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to initialize database: {e}")
+        Initialize repository on a connection and ensure the schema exists.
+        The connection may be shared with other repositories; it is owned
+        and closed by the caller.
+        """
+        self._conn = conn
+        # Serialize use of the connection across threads; a SharedConnection
+        # carries one lock for all repositories that use it
+        lock = getattr(conn, "lock", None)
+        self._lock = lock if lock is not None else threading.RLock()
+        with self._lock:
+            ensure_schema(conn)
+
+    @contextmanager
+    def _cursor(self):
+        """Yield a cursor on the persistent connection under the lock."""
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    def transaction(self):
+        """
+        Group the enclosed operations into one BEGIN IMMEDIATE transaction.
+        Commits on success and rolls back on any exception. Nested use
+        joins the outer transaction rather than starting a new one.
+        Raises: RepositoryError: If the transaction cannot begin or commit.
+        """
+        return immediate_transaction(self._conn, self._lock)
 
-    def _row_to_visit(self, row: sqlite3.Row) -> Visit:
+    def _row_to_visit(self, row: tuple) -> Visit:
         """ Convert database row to a Visit object. """
-        return Visit(
-            id=row['id'],
-            restaurant_id=row['restaurant_id'],
-            visit_date=date.fromisoformat(row['visit_date']),
-            rating=row['rating'],
-            meal_type=row['meal_type'],
-            service_rating=row['service_rating'],
-            dishes_ordered=row['dishes_ordered'],
-            recommended_dishes=row['recommended_dishes'],
-            beverage_ordered=row['beverage_ordered'],
-            total_cost=row['total_cost'],
-            notes=row['notes'],
-            would_return=bool(row['would_return'])
-        )
+        return Visit.from_tuple(row)
 
+    @sql_operation("add visit", "Invalid restaurant_id or constraint violation")
     def add(self, visit: Visit) -> Visit:
         """ Add a new visit to the database.
         Raises: RepositoryError: If database operation fails.
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Enable foreign key constraints
-            cursor.execute("PRAGMA foreign_keys = ON;")
-
-            cursor.execute("""
-                        INSERT INTO visits (
-                    restaurant_id, visit_date, rating, meal_type,
-                    service_rating, dishes_ordered, recommended_dishes,
-                    beverage_ordered, total_cost, notes, would_return
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_INSERT, (
                 visit.restaurant_id,
-                visit.visit_date,
+                visit.visit_date.toordinal(),
                 visit.rating,
                 visit.meal_type,
                 visit.service_rating,
@@ -111,121 +151,146 @@ class SqliteVisitRepository(VisitRepository):
                 1 if visit.would_return else 0
             ))
 
-            visit_id = cursor.lastrowid
-
-            conn.commit()
-            conn.close()
-
-            # Return new Visit object with ID
-            return Visit(
-                id=visit_id,
-                restaurant_id=visit.restaurant_id,
-                visit_date=visit.visit_date,
-                rating=visit.rating,
-                meal_type=visit.meal_type,
-                service_rating=visit.service_rating,
-                dishes_ordered=visit.dishes_ordered,
-                recommended_dishes=visit.recommended_dishes,
-                beverage_ordered=visit.beverage_ordered,
-                total_cost=visit.total_cost,
-                notes=visit.notes,
-                would_return=visit.would_return
-            )
-
-        except sqlite3.IntegrityError as e:
-            # Foreign key violation or other constraint error
-            raise RepositoryError(f"Failed to add visit: Invalid restaurant_id or constraint violation ({e})")
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to add visit: {e}")
+            # RETURNING hands back the stored row, ID included
+            return self._row_to_visit(cursor.fetchone())
+
+    @sql_operation("add visit", "Invalid restaurant_id or constraint violation")
+    def add_if_absent(self, visit: Visit) -> Optional[Visit]:
+        """
+        Add a visit unless its restaurant already has one, in one statement.
+        Returns the stored visit, or None if the restaurant already had a visit.
+        Raises: RepositoryError: If database operation fails, including
+        an unknown restaurant_id.
+        """
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_INSERT_IF_ABSENT, (
+                visit.restaurant_id,
+                visit.visit_date.toordinal(),
+                visit.rating,
+                visit.meal_type,
+                visit.service_rating,
+                visit.dishes_ordered,
+                visit.recommended_dishes,
+                visit.beverage_ordered,
+                visit.total_cost,
+                visit.notes,
+                1 if visit.would_return else 0
+            ))
+            row = cursor.fetchone()
+
+            return self._row_to_visit(row) if row is not None else None
+
+    @sql_operation("add visit", "Invalid restaurant_id or constraint violation")
+    def add_raw(self, fields: tuple) -> int:
+        """
+        Insert one visit from a plain tuple and return its new ID.
+        Fields follow the INSERT column order with storage values:
+        visit_date as date.toordinal() and would_return as 0/1.
+        No model validation is done; the foreign key still applies.
+        Raises: RepositoryError: If database operation fails.
+        """
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_INSERT_RAW, fields)
+            return cursor.lastrowid
 
+    @sql_operation("add visits", "Invalid restaurant_id or constraint violation")
+    def add_many(self, visits: Iterable[Visit]) -> List[Visit]:
+        """
+        Add several visits in one transaction; all rows are inserted or none.
+        Raises: RepositoryError: If database operation fails.
+        """
+        with self.transaction(), self._cursor() as cursor:
+            added = []
+            for visit in visits:
+                cursor.execute(_SQL_INSERT, (
+                    visit.restaurant_id,
+                    visit.visit_date.toordinal(),
+                    visit.rating,
+                    visit.meal_type,
+                    visit.service_rating,
+                    visit.dishes_ordered,
+                    visit.recommended_dishes,
+                    visit.beverage_ordered,
+                    visit.total_cost,
+                    visit.notes,
+                    1 if visit.would_return else 0
+                ))
+                added.append(self._row_to_visit(cursor.fetchone()))
+
+        return added
+
+    @sql_operation("get visit")
     def get_by_id(self, visit_id: int) -> Optional[Visit]:
         """
         Retrieve a visit by its ID.
         Raises: RepositoryError: If database operation fails.
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT * FROM visits WHERE id = ?", (visit_id,))
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_SELECT_BY_ID, (visit_id,))
             row = cursor.fetchone()
 
-            conn.close()
-
             if row is None:
                 return None
 
             return self._row_to_visit(row)
 
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to get visit: {e}")
-
+    @sql_operation("get visit")
     def get_by_restaurant_id(self, restaurant_id: int) -> Optional[Visit]:
         """
         Retrieve the visit for a specific restaurant.
         Raises: RepositoryError: If database operation fails.
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT * FROM visits WHERE restaurant_id = ?", (restaurant_id,))
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_SELECT_BY_RESTAURANT, (restaurant_id,))
 
             row = cursor.fetchone()
 
-            conn.close()
-
             if row is None:
                 return None
 
             return self._row_to_visit(row)
 
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to get visit: {e}")
-
-    def get_all(self) -> List[Visit]:
+    def iter_all(self) -> Iterator[Visit]:
         """
-        Retrieve all visits.
+        Yield all visits, newest first, fetching rows in batches.
         Raises: RepositoryError: If database operation fails.
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT * FROM visits order by visit_date DESC")
-            rows = cursor.fetchall()
-
-            conn.close()
-
-            return [self._row_to_visit(row) for row in rows]
+            cursor = self._conn.cursor()
+            try:
+                cursor.arraysize = _FETCH_BATCH
+                with self._lock:
+                    cursor.execute(_SQL_SELECT_ALL)
+                while True:
+                    with self._lock:
+                        rows = cursor.fetchmany()
+                    if not rows:
+                        return
+                    for row in rows:
+                        yield self._row_to_visit(row)
+            finally:
+                cursor.close()
 
         except sqlite3.Error as e:
             raise RepositoryError(f"Failed to get visits: {e}")
 
+    def get_all(self) -> List[Visit]:
+        """
+        Retrieve all visits.
+        Raises: RepositoryError: If database operation fails.
+        """
+        return list(self.iter_all())
+
+    @sql_operation("update visit", "Invalid restaurant_id")
     def update(self, visit: Visit) -> Visit:
         """
         Update an existing visit.
         Raises: RepositoryError: If database operation fails.
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Enable foreign key constraints
-            cursor.execute("PRAGMA foreign_keys = ON;")
-
-            cursor.execute("""
-                UPDATE visits
-                        SET restaurant_id = ?, visit_date = ?, rating = ?, meal_type = ?,
-                            service_rating = ?, dishes_ordered = ?, recommended_dishes = ?,
-                            beverage_ordered = ?, total_cost = ?, notes = ?, would_return = ?
-                        WHERE id = ?
-            """, (
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_UPDATE, (
                 visit.restaurant_id,
-                visit.visit_date,
+                visit.visit_date.toordinal(),
                 visit.rating,
                 visit.meal_type,
                 visit.service_rating,
@@ -240,94 +305,100 @@ class SqliteVisitRepository(VisitRepository):
 
             rows_affected = cursor.rowcount
 
-            conn.commit()
-            conn.close()
-
             return rows_affected > 0
 
-        except sqlite3.IntegrityError as e:
-            raise RepositoryError(f"Failed to update visit: Invalid restaurant_id ({e})")
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to update visit: {e}")
-
+    @sql_operation("update visit", "Invalid restaurant_id")
+    def update_fields(self, visit_id: int, fields: Dict[str, object]) -> bool:
+        """
+        Update only the given columns of a visit, taking model values
+        (a date for visit_date, a bool for would_return). Values must
+        already be validated. Returns False if no visit has the ID.
+        Raises: RepositoryError: If a column is unknown or the database operation fails.
+        """
+        unknown = fields.keys() - _UPDATABLE_COLUMNS.keys()
+        if unknown:
+            raise RepositoryError(f"Cannot update visit columns: {', '.join(sorted(unknown))}")
+
+        # Table order keeps the statement text, and its cached prepared
+        # statement, the same for the same set of columns
+        columns = [c for c in _UPDATABLE_COLUMNS if c in fields]
+        if not columns:
+            return self.get_by_id(visit_id) is not None
+
+        params = []
+        for column in columns:
+            value = fields[column]
+            convert = _UPDATABLE_COLUMNS[column]
+            params.append(convert(value) if convert and value is not None else value)
+        params.append(visit_id)
+
+        assignments = ", ".join(f"{c} = ?" for c in columns)
+        with self._cursor() as cursor:
+            cursor.execute(f"UPDATE visits SET {assignments} WHERE id = ?", params)
+            return cursor.rowcount > 0
+
+    @sql_operation("delete visit")
     def delete(self, visit_id: int) -> bool:
         """
         Delete a visit by its ID.
         Raises: RepositoryError: If database operation fails.
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("DELETE FROM visits WHERE id = ?", (visit_id,))
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_DELETE, (visit_id,))
 
             rows_affected = cursor.rowcount
 
-            conn.commit()
-            conn.close()
-
             return rows_affected > 0
 
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to delete visit: {e}")
-
+    @sql_operation("delete visit by restaurant_id")
     def delete_by_restaurant_id(self, restaurant_id: int) -> bool:
         """
         Delete the visit associated with a restaurant
         Raises: RepositoryError: If database operation fails.
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("DELETE FROM visits WHERE restaurant_id = ?", (restaurant_id,))
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_DELETE_BY_RESTAURANT, (restaurant_id,))
 
             rows_affected = cursor.rowcount
 
-            conn.commit()
-            conn.close()
-
             return rows_affected > 0
 
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to delete visit by restaurant_id: {e}")
-
+    @sql_operation("filter visits by meal type")
     def filter_by_meal_type(self, meal_type: str) -> List[Visit]:
         """
         Retrieve visits filtered by meal type.
         Raises: RepositoryError: If database operation fails.
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT * FROM visits WHERE meal_type = ? ORDER BY visit_date DESC", (meal_type,))
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_FILTER_BY_MEAL_TYPE, (meal_type,))
             rows = cursor.fetchall()
 
-            conn.close()
-
             return [self._row_to_visit(row) for row in rows]
 
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to filter visits by meal type: {e}")
-
-    def filter_by_rating(self, min_rating: int) -> List[Visit]:
+    @sql_operation("filter visits by rating")
+    def filter_by_rating(self, min_rating: int, limit: Optional[int] = None) -> List[Visit]:
         """
-        Retrieve visits by minimum rating.
+        Retrieve visits by minimum rating, newest first.
+        With a limit, only the top limit visits are returned, highest
+        rated first and newest first among equal ratings.
         Raises: RepositoryError: If database operation fails.
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT * FROM visits WHERE rating >= ? ORDER BY visit_date DESC", (min_rating,))
+        with self._cursor() as cursor:
+            if limit is None:
+                cursor.execute(_SQL_FILTER_BY_RATING, (min_rating,))
+            else:
+                cursor.execute(_SQL_TOP_BY_RATING, (min_rating, limit))
             rows = cursor.fetchall()
 
-            conn.close()
-
             return [self._row_to_visit(row) for row in rows]
 
-        except sqlite3.Error as e:
-            raise RepositoryError(f"Failed to filter visits by rating: {e}")
+    @sql_operation("count visits by restaurant")
+    def get_visit_counts_by_restaurant(self) -> Dict[int, int]:
+        """
+        Count visits per restaurant with one grouped query.
+        Restaurants without visits are absent from the result.
+        Raises: RepositoryError: If database operation fails.
+        """
+        with self._cursor() as cursor:
+            cursor.execute(_SQL_COUNT_BY_RESTAURANT)
+            return dict(cursor.fetchall())
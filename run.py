@@ -3,7 +3,8 @@ Bite Tracker - Restaurant Visit & Review Manager
 A CLI application for tracking restaurant visits and reviews.
 """
 
-from repositories import SqliteRestaurantRepository, SqliteVisitRepository
+import sys
+from repositories import SqliteRestaurantRepository, SqliteVisitRepository, connect
 from services import RestaurantService, VisitService
 from cli import CLIHandler, MainMenu
 
@@ -23,47 +24,63 @@ def main():
     print("\n  Initializing application...")
 
     # Initialize repository layer (data access)
+    # Both repositories share one connection and its page cache
     try:
-        restaurant_repo = SqliteRestaurantRepository()
-        visit_repo = SqliteVisitRepository()
-        print("  ✓ Database initialized")
+        conn = connect()
     except Exception as e:
         print(f"\n   ERROR: Failed to initialize database: {e}")
         print("  Please check that the 'data' directory is writable.\n")
         return
 
-    # Initialize service layer (business logic)
+    # The connection stays open for the session; close it on every exit path
     try:
-        restaurant_service = RestaurantService(restaurant_repo, visit_repo)
-        visit_service = VisitService(visit_repo, restaurant_repo)
-        print("  ✓ Services initialized")
-    except Exception as e:
-        print(f"\n   ERROR: Failed to initialize services: {e}\n")
-        return
+        try:
+            restaurant_repo = SqliteRestaurantRepository(conn)
+            visit_repo = SqliteVisitRepository(conn)
+            print("  ✓ Database initialized")
+        except Exception as e:
+            print(f"\n   ERROR: {e}\n")
+            return
 
-    # Initialize CLI layer (user interface)
-    try:
-        cli_handler = CLIHandler(restaurant_service, visit_service)
-        main_menu = MainMenu(cli_handler)
-        print("  ✓ User interface ready")
-    except Exception as e:
-        print(f"\n   ERROR: Failed to initialize CLI: {e}\n")
-        return
+        # Initialize service layer (business logic)
+        try:
+            restaurant_service = RestaurantService(restaurant_repo, visit_repo)
+            visit_service = VisitService(visit_repo, restaurant_repo)
+            print("  ✓ Services initialized")
+        except Exception as e:
+            print(f"\n   ERROR: Failed to initialize services: {e}\n")
+            return
 
-    print("\n  Starting application...\n")
+        # When output is redirected, buffer it and flush once per screen
+        if not sys.stdout.isatty():
+            sys.stdout.reconfigure(line_buffering=False, write_through=False)
 
-    # Run the application
-    try:
-        main_menu.run()
-    except KeyboardInterrupt:
-        # Handle Ctrl+C gracefully
-        print("\n\n" + "=" * 60)
-        print("  Application interrupted by user.")
-        print("  Thank you for using Bite Tracker!")
-        print("=" * 60 + "\n")
-    except Exception as e:
-        print(f"\n\n UNEXPECTED ERROR: {e}")
-        print("Please report this issue.\n")
+        # Initialize CLI layer (user interface)
+        try:
+            cli_handler = CLIHandler(restaurant_service, visit_service)
+            main_menu = MainMenu(cli_handler)
+            print("  ✓ User interface ready")
+        except Exception as e:
+            print(f"\n   ERROR: Failed to initialize CLI: {e}\n")
+            return
+
+        print("\n  Starting application...\n")
+
+        # Run the application
+        try:
+            main_menu.run()
+        except KeyboardInterrupt:
+            # Handle Ctrl+C gracefully
+            print("\n\n" + "=" * 60)
+            print("  Application interrupted by user.")
+            print("  Thank you for using Bite Tracker!")
+            print("=" * 60 + "\n")
+        except Exception as e:
+            print(f"\n\n UNEXPECTED ERROR: {e}")
+            print("Please report this issue.\n")
+
+    finally:
+        conn.close()
 
 
 if __name__ == "__main__":
@@ -4,11 +4,24 @@ Handles business logic ans orchestration for restaurant related operations
 Sits between the CLI layer and repository layer
 """
 
-from typing import List, Optional
-from models import Restaurant
+import string
+from copy import copy
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple
+from models import Restaurant, Visit
 from repositories import RestaurantRepository, VisitRepository
 from exceptions import ValidationError, BusinessRuleViolationError, NotFoundError
 
+# Restaurant fields an update may change
+_EDITABLE_FIELDS = (
+    "name", "location", "country", "cuisine_type",
+    "price_range", "phone", "website", "social_media",
+)
+
+# Folds A-Z only, the same way SQLite's NOCASE collation does. str.lower()
+# also folds letters such as 'Ö', which NOCASE then no longer matches.
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
 
 class RestaurantService:
     """
@@ -17,11 +30,37 @@ class RestaurantService:
     Enforces business rules and operations.
     """
 
+    __slots__ = (
+        '_restaurant_repo',
+        '_visit_repo',
+        '_search_cache',
+        '_country_cache',
+        '_restaurant_cache',
+        '_list_cache',
+    )
+
     def __init__(self, restaurant_repo: RestaurantRepository, visit_repo: VisitRepository):
         """Initialize with repository dependencies."""
         self._restaurant_repo = restaurant_repo
         self._visit_repo = visit_repo
 
+        # Recent search/filter results, keyed by the normalized term.
+        # Cleared whenever restaurants are created, updated or deleted.
+        self._search_cache = lru_cache(maxsize=32)(restaurant_repo.search_by_name)
+        self._country_cache = lru_cache(maxsize=32)(restaurant_repo.filter_by_country)
+        # Restaurants looked up by ID, so repeated existence checks on the
+        # same restaurant skip the database. Callers only ever get copies.
+        self._restaurant_cache = lru_cache(maxsize=128)(restaurant_repo.get_by_id)
+        # Full restaurant list, kept until the next data change
+        self._list_cache: Optional[List[Restaurant]] = None
+
+    def _clear_query_caches(self) -> None:
+        """Drop cached lookups, search and filter results after a data change."""
+        self._search_cache.cache_clear()
+        self._country_cache.cache_clear()
+        self._restaurant_cache.cache_clear()
+        self._list_cache = None
+
     def create_restaurant(
             self, name: str,
             location: str,
@@ -69,7 +108,30 @@ class RestaurantService:
         )
 
         # Persist to database
-        return self._restaurant_repo.add(restaurant)
+        created = self._restaurant_repo.add(restaurant)
+        self._clear_query_caches()
+        return created
+
+    def create_restaurants(self, restaurants: Iterable[Restaurant]) -> List[Restaurant]:
+        """
+        Create several restaurants at once, e.g. for imports or seeding.
+
+        Business rules:
+        - Each Restaurant was validated when it was constructed
+        - Inserted in a single transaction: all are saved or none
+
+        Args:
+            restaurants: Restaurant objects without IDs
+
+        Returns:
+            Created Restaurant objects with assigned IDs
+
+        Raises:
+            RepositoryError: If database operation fails
+        """
+        created = self._restaurant_repo.add_many(restaurants)
+        self._clear_query_caches()
+        return created
 
     def get_restaurant(self, restaurant_id: int) -> Restaurant:
         """
@@ -77,18 +139,67 @@ class RestaurantService:
         Raises: NotFoundError: If no restaurant with the given ID exists
         RepositoryError: If database operation fails
         """
-        restaurant = self._restaurant_repo.get_by_id(restaurant_id)
+        restaurant = self._restaurant_cache(restaurant_id)
         if restaurant is None:
             raise NotFoundError(f"Restaurant with ID {restaurant_id} not found")
 
-        return restaurant
+        # Copy so callers can't change the cached restaurant
+        return copy(restaurant)
+
+    def get_restaurant_with_visit(self, restaurant_id: int) -> Tuple[Restaurant, Optional[Visit]]:
+        """
+        Get a restaurant and its visit (None if unvisited) in one query,
+        e.g. for a detail view.
+        Raises: NotFoundError: If no restaurant with the given ID exists
+        RepositoryError: If database operation fails
+        """
+        result = self._restaurant_repo.get_with_visit(restaurant_id)
+        if result is None:
+            raise NotFoundError(f"Restaurant with ID {restaurant_id} not found")
+
+        return result
 
     def get_all_restaurants(self) -> List[Restaurant]:
         """
         Get all restaurants.
         Raises: RepositoryError: If database operation fails
         """
-        return self._restaurant_repo.get_all()
+        if self._list_cache is None:
+            self._list_cache = self._restaurant_repo.get_all()
+
+        # Copy so callers can't change the cached list or restaurants
+        return [copy(r) for r in self._list_cache]
+
+    def get_restaurant_listing(self) -> List[Tuple[int, str]]:
+        """
+        Get (id, display text) pairs for all restaurants, ready to print.
+        Raises: RepositoryError: If database operation fails
+        """
+        return self._restaurant_repo.list_display_strings()
+
+    def get_restaurants_with_visit_counts(self) -> List[Tuple[Restaurant, int]]:
+        """
+        Get all restaurants paired with their number of visits.
+        Two queries in total, joined here by restaurant ID.
+        Raises: RepositoryError: If database operation fails
+        """
+        counts = self._visit_repo.get_visit_counts_by_restaurant()
+        return [(r, counts.get(r.id, 0)) for r in self._restaurant_repo.iter_all()]
+
+    def iter_restaurants(self) -> Iterator[Restaurant]:
+        """
+        Stream all restaurants for callers that only index or filter them.
+        Raises: RepositoryError: If database operation fails
+        """
+        return self._restaurant_repo.iter_all()
+
+    def get_restaurants_with_visits(self) -> List[Tuple[Restaurant, Optional[Visit]]]:
+        """
+        Get all restaurants, each paired with its visit (None if unvisited).
+        Fetched in one query rather than a visit lookup per restaurant.
+        Raises: RepositoryError: If database operation fails
+        """
+        return self._restaurant_repo.get_all_with_visits()
 
     def search_restaurants(self, name: str) -> List[Restaurant]:
         """
@@ -96,10 +207,12 @@ class RestaurantService:
         Raises: ValidationError: If search term is empty
         RepositoryError: If database operation fails
         """
-        if not name or not name.strip():
+        if not name or name.isspace():
             raise ValidationError("Search term cannot be empty")
 
-        return self._restaurant_repo.search_by_name(name.strip())
+        # Search is case-insensitive, so normalize before hitting the cache.
+        # Copy so callers can't change the cached list or restaurants.
+        return [copy(r) for r in self._search_cache(name.strip().lower())]
 
     def get_restaurants_by_country(self, country: str) -> List[Restaurant]:
         """
@@ -107,10 +220,14 @@ class RestaurantService:
         Raises: ValidationError: If country is empty
         RepositoryError: If database operation fails
         """
-        if not country or not country.strip():
+        if not country or country.isspace():
             raise ValidationError("Country cannot be empty")
 
-        return self._restaurant_repo.filter_by_country(country.strip())
+        # Fold case like the NOCASE comparison does, so case variants
+        # share a cache entry and still match the same rows.
+        # Copy so callers can't change the cached list or restaurants.
+        key = country.strip().translate(_ASCII_LOWER)
+        return [copy(r) for r in self._country_cache(key)]
 
     def update_restaurant(
             self,
@@ -151,7 +268,7 @@ class RestaurantService:
             RepositoryError: If database operation fails
         """
         # Check if restaurant exists
-        existing = self._restaurant_repo.get_by_id(restaurant_id)
+        existing = self._restaurant_cache(restaurant_id)
         if existing is None:
             raise NotFoundError(f"Restaurant with ID {restaurant_id} not found")
 
@@ -168,11 +285,16 @@ class RestaurantService:
             social_media=social_media
         )
 
-        # Persist updates to database
-        success = self._restaurant_repo.update(updated_restaurant)
-
-        if not success:
-            raise NotFoundError(f"restaurant with ID {restaurant_id} not found")
+        # Write only the columns that actually changed
+        changed = {
+            field: getattr(updated_restaurant, field)
+            for field in _EDITABLE_FIELDS
+            if getattr(updated_restaurant, field) != getattr(existing, field)
+        }
+        if changed:
+            if not self._restaurant_repo.update_fields(restaurant_id, changed):
+                raise NotFoundError(f"Restaurant with ID {restaurant_id} not found")
+            self._clear_query_caches()
 
         return updated_restaurant
 
@@ -193,21 +315,18 @@ class RestaurantService:
             BusinessRuleViolationError: If restaurant has a visit
             RepositoryError: If database operation fails
         """
-        # Verify restaurant exists
-        restaurant = self._restaurant_repo.get_by_id(restaurant_id)
+        # One statement deletes the restaurant only if it has no visit
+        if self._restaurant_repo.delete_if_no_visit(restaurant_id):
+            self._clear_query_caches()
+            return
+
+        # Nothing deleted: either the restaurant is missing or it has a visit
+        restaurant = self._restaurant_cache(restaurant_id)
         if restaurant is None:
             raise NotFoundError(f"Restaurant with ID {restaurant_id} not found")
 
-        # Business rule: Check if restaurant has a visit
-        visit = self._visit_repo.get_by_restaurant_id(restaurant_id)
-        if visit is not None:
-            raise BusinessRuleViolationError(
-                f"Cannot delete restaurant '{restaurant.name}'. "
-                f"Please delete the associated visit first."
-            )
-
-        # Safe to delete
-        success = self._restaurant_repo.delete(restaurant_id)
-
-        if not success:
-            raise NotFoundError(f"Restaurant with ID {restaurant_id} not found")
+        # Business rule: Cannot delete a restaurant that has a visit
+        raise BusinessRuleViolationError(
+            f"Cannot delete restaurant '{restaurant.name}'. "
+            f"Please delete the associated visit first."
+        )
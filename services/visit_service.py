@@ -4,11 +4,36 @@ Handles business logic and operations.
 Enforces relationship rules between visits and restaurants.
 """
 
+from copy import copy
+from functools import lru_cache
 from typing import List, Optional
 from datetime import date
 from models import Visit
 from repositories.base import RestaurantRepository, VisitRepository
-from exceptions import ValidationError, BusinessRuleViolationError, NotFoundError
+from exceptions import (
+    ValidationError,
+    BusinessRuleViolationError,
+    NotFoundError,
+    DuplicateEntryError,
+    RepositoryError
+)
+
+# Meal types accepted by the meal type filter
+_VALID_MEAL_TYPES = frozenset({'breakfast', 'lunch', 'dinner', 'brunch', 'other'})
+_VALID_MEAL_TYPES_STR = 'breakfast, lunch, dinner, brunch, other'
+# Common exact spellings mapped to the stored form, checked before normalizing
+_MEAL_LOOKUP = {
+    variant: meal
+    for meal in _VALID_MEAL_TYPES
+    for variant in (meal, meal.capitalize(), meal.upper())
+}
+
+# Visit fields an update may change
+_EDITABLE_FIELDS = (
+    "restaurant_id", "visit_date", "rating", "meal_type", "service_rating",
+    "dishes_ordered", "recommended_dishes", "beverage_ordered",
+    "total_cost", "notes", "would_return",
+)
 
 
 class VisitService:
@@ -17,6 +42,14 @@ class VisitService:
     Enforces business rules related to the restaurant-visit relationship.
     """
 
+    __slots__ = (
+        '_visit_repo',
+        '_restaurant_repo',
+        '_visit_cache',
+        '_restaurant_visit_cache',
+        '_list_cache',
+    )
+
     def __init__(
         self,
         visit_repo: VisitRepository,
@@ -28,6 +61,23 @@ class VisitService:
         self._visit_repo = visit_repo
         self._restaurant_repo = restaurant_repo
 
+        # Visits looked up by ID or by restaurant, so repeated checks on the
+        # same visit skip the database. Only this service writes visits, so
+        # clearing on every write here keeps them current. Callers only
+        # ever get copies.
+        self._visit_cache = lru_cache(maxsize=128)(visit_repo.get_by_id)
+        self._restaurant_visit_cache = lru_cache(maxsize=128)(
+            visit_repo.get_by_restaurant_id
+        )
+        # Full visit list, kept until the next data change
+        self._list_cache: Optional[List[Visit]] = None
+
+    def _clear_caches(self) -> None:
+        """Drop cached visit lookups after a data change."""
+        self._visit_cache.cache_clear()
+        self._restaurant_visit_cache.cache_clear()
+        self._list_cache = None
+
     def create_visit(
         self,
         restaurant_id: int,
@@ -72,21 +122,6 @@ class VisitService:
             ValidationError: If any input is invalid
             RepositoryError: If database operation fails
         """
-        # Business rule 1: Restaurant must exist
-        restaurant = self._restaurant_repo.get_by_id(restaurant_id)
-        if restaurant is None:
-            raise NotFoundError(
-                f"Cannot create visit: Restaurant with ID {restaurant_id} not found."
-            )
-
-        # Business rule 2: Restaurant cannot already have a visit
-        existing_visit = self._visit_repo.get_by_restaurant_id(restaurant_id)
-        if existing_visit is not None:
-            raise BusinessRuleViolationError(
-                f"Restaurant '{restaurant.name}' already has a visit recorded."
-                f"Please update the existing visit instead of creating a new one."
-            )
-
         # Create Visit object
         visit = Visit(
             restaurant_id=restaurant_id,
@@ -102,8 +137,32 @@ class VisitService:
             would_return=would_return
         )
 
-        # Persist to database
-        return self._visit_repo.add(visit)
+        # Persist in one statement: the foreign key enforces business rule 1
+        # (restaurant must exist) and the unique index on restaurant_id
+        # business rule 2 (one visit per restaurant). The restaurant is only
+        # looked up when the insert fails, to report which rule was broken.
+        try:
+            created = self._visit_repo.add_if_absent(visit)
+        except RepositoryError:
+            if self._restaurant_repo.get_by_id(restaurant_id) is None:
+                raise NotFoundError(
+                    f"Cannot create visit: Restaurant with ID {restaurant_id} not found."
+                )
+            raise
+
+        if created is None:
+            restaurant = self._restaurant_repo.get_by_id(restaurant_id)
+            if restaurant is None:
+                raise NotFoundError(
+                    f"Cannot create visit: Restaurant with ID {restaurant_id} not found."
+                )
+            raise BusinessRuleViolationError(
+                f"Restaurant '{restaurant.name}' already has a visit recorded."
+                f"Please update the existing visit instead of creating a new one."
+            )
+
+        self._clear_caches()
+        return created
 
     def get_visit(self, visit_id: int) -> Visit:
         """
@@ -111,52 +170,66 @@ class VisitService:
         Raises: NotFoundError if visit doesn't exist
         RepositoryError if database operation fails
         """
-        visit = self._visit_repo.get_by_id(visit_id)
+        visit = self._visit_cache(visit_id)
         if visit is None:
             raise NotFoundError(f"Visit with ID {visit_id} not found.")
-        return visit
+
+        # Copy so callers can't change the cached visit
+        return copy(visit)
 
     def get_visit_for_restaurant(self, restaurant_id: int) -> Optional[Visit]:
         """
         Get the visit for a specific restaurant.
         Raises: RepositoryError if database operation fails
         """
-        return self._visit_repo.get_by_restaurant_id(restaurant_id)
+        visit = self._restaurant_visit_cache(restaurant_id)
+        return copy(visit) if visit is not None else None
 
     def get_all_visits(self) -> List[Visit]:
         """
         Get all visits.
         Raises: RepositoryError if database operation fails
         """
-        return self._visit_repo.get_all()
+        if self._list_cache is None:
+            self._list_cache = self._visit_repo.get_all()
+
+        # Copy so callers can't change the cached list or visits
+        return [copy(v) for v in self._list_cache]
 
-    def get_top_rated_visits(self, min_rating: int = 5) -> List[Visit]:
+    def get_top_rated_visits(self, min_rating: int = 5, limit: Optional[int] = None) -> List[Visit]:
         """
-        Get visits with a minimum rating.
-        Raises: RepositoryError if database operation fails
+        Get visits with a minimum rating, newest first.
+        Pass limit to get only the top rated visits, highest rating first
+        (newest first among equal ratings); the database stops there.
+        Raises: ValidationError if min_rating or limit is invalid
+        RepositoryError if database operation fails
         """
-        if not isinstance(min_rating, int) or min_rating not in [1, 2, 3, 4, 5]:
+        if not (type(min_rating) is int and 1 <= min_rating <= 5):
             raise ValidationError("Mininum rating must be between 1 and 5")
 
-        return self._visit_repo.filter_by_rating(min_rating)
+        if limit is not None and not (type(limit) is int and limit >= 1):
+            raise ValidationError("Limit must be a positive number")
+
+        return self._visit_repo.filter_by_rating(min_rating, limit)
 
-    def get_visit_by_meal_type(self, meal_type: str) -> List[Visit]:
+    def get_visits_by_meal_type(self, meal_type: str) -> List[Visit]:
         """
         Filter visits by meal type
         Raises: ValidationError if meal_type is invalid
-        RepoditoryError if database operation fail
+        RepositoryError if database operation fails
         """
-        valid_meal_types = ['breakfast', 'lunch', 'dinner', 'brunch', 'other']
+        normalized = _MEAL_LOOKUP.get(meal_type)
+        if normalized is None:
+            if not meal_type or meal_type.isspace():
+                raise ValidationError("Meal type cannot be empty")
 
-        if not meal_type or not meal_type.strip():
-            raise ValidationError("Meal type cannot be empty")
+            normalized = meal_type.strip().lower()
+            if normalized not in _VALID_MEAL_TYPES:
+                raise ValidationError(
+                    f"Invalid meal type. Must be one of {_VALID_MEAL_TYPES_STR}"
+                    )
 
-        normalized = meal_type.strip().lower()
-        if normalized not in valid_meal_types:
-            raise ValidationError(
-                f"Ivalid meal type. Must be one of {', '.join(valid_meal_types)}"
-                )
-            return self._visit_repo.filter_by_meal_type(normalized)
+        return self._visit_repo.filter_by_meal_type(normalized)
 
     def update_visit(
             self,
@@ -206,24 +279,10 @@ class VisitService:
             RepositoryError: If database operation fails
         """
         # Verify visit exists
-        existing_visit = self._visit_repo.get_by_id(visit_id)
+        existing_visit = self._visit_cache(visit_id)
         if existing_visit is None:
             raise NotFoundError(f"Visit with ID {visit_id} not found")
 
-        # Verify restaurant exists
-        restaurant = self._restaurant_repo.get_by_id(restaurant_id)
-        if restaurant is None:
-            raise NotFoundError(f"Cannot update visit: Restaurant with ID {restaurant_id} not found")
-
-        # If changing restaurant, check new restaurant doesn't have a visit
-        if restaurant_id != existing_visit.restaurant_id:
-            other_visit = self._visit_repo.get_by_restaurant_id(restaurant_id)
-            if other_visit is not None:
-                raise BusinessRuleViolationError(
-                    f"Cannot move visit to restaurant '{restaurant.name}': "
-                    f"that restaurant already has a visit recorded."
-                )
-
         # Create updated Visit object (validation happens in __post_init__)
         updated_visit = Visit(
             id=visit_id,
@@ -240,11 +299,33 @@ class VisitService:
             would_return=would_return
         )
 
-        # Persist changes
-        success = self._visit_repo.update(updated_visit)
+        # Moving restaurants: the new restaurant must exist
+        restaurant = None
+        if restaurant_id != existing_visit.restaurant_id:
+            restaurant = self._restaurant_repo.get_by_id(restaurant_id)
+            if restaurant is None:
+                raise NotFoundError(f"Cannot update visit: Restaurant with ID {restaurant_id} not found")
+
+        # Write only the columns that actually changed
+        changed = {
+            field: getattr(updated_visit, field)
+            for field in _EDITABLE_FIELDS
+            if getattr(updated_visit, field) != getattr(existing_visit, field)
+        }
+        if changed:
+            # The unique index on restaurant_id rejects a move to a
+            # restaurant that already has a visit
+            try:
+                success = self._visit_repo.update_fields(visit_id, changed)
+            except DuplicateEntryError:
+                raise BusinessRuleViolationError(
+                    f"Cannot move visit to restaurant '{restaurant.name}': "
+                    f"that restaurant already has a visit recorded."
+                )
 
-        if not success:
-            raise NotFoundError(f"Visit with ID {visit_id} not found")
+            if not success:
+                raise NotFoundError(f"Visit with ID {visit_id} not found")
+            self._clear_caches()
 
         return updated_visit
 
@@ -254,16 +335,11 @@ class VisitService:
         Raises: NotFoundError: If visit doesn't exist
         RepositoryError: If database operation fails
         """
-        # Verify visit exists
-        visit = self._visit_repo.get_by_id(visit_id)
-        if visit is None:
+        # The delete's row count tells us whether the visit existed
+        if not self._visit_repo.delete(visit_id):
             raise NotFoundError(f"Visit with ID {visit_id} not found")
 
-        # Delete the visit
-        success = self._visit_repo.delete(visit_id)
-
-        if not success:
-            raise NotFoundError(f"Visit with ID {visit_id} not found")
+        self._clear_caches()
 
     def delete_visit_for_restaurant(self, restaurant_id: int) -> None:
         """
@@ -271,17 +347,10 @@ class VisitService:
         Raises: NotFoundError: If visit doesn't exist
         RepositoryError: If database operation fails
         """
-        # Check if visit exists
-        visit = self._visit_repo.get_by_restaurant_id(restaurant_id)
-        if visit is None:
-            raise NotFoundError(
-                f"No visit found for restaurant with ID {restaurant_id}"
-                )
-
-        # Delete the visit
-        success = self._visit_repo.delete_by_restaurant_id(restaurant_id)
-
-        if not success:
+        # The delete's row count tells us whether a visit existed
+        if not self._visit_repo.delete_by_restaurant_id(restaurant_id):
             raise NotFoundError(
                 f"No visit found for restaurant with ID {restaurant_id}"
             )
+
+        self._clear_caches()
@@ -4,10 +4,61 @@ Handles validation and sanitization of user input
 from the command line, separate from domain model validation.
 """
 
-from datetime import datetime, date
+import re
+from datetime import date
+from functools import lru_cache
 from typing import Optional
 from exceptions import ValidationError
 
+# Numeric input is matched before conversion so that bad input
+# is rejected without going through int()/float() exceptions
+_INT_RE = re.compile(r"-?\d+")
+_FLOAT_RE = re.compile(r"-?(?:\d+(?:\.\d*)?|\.\d+)")
+
+# Accepted visit date formats, matched in one pass:
+# 2024-03-15 (groups 1-3) or 15/03/2024 and 15-03-2024 (groups 4-7)
+_DATE_RE = re.compile(
+    r"(\d{4})-(\d{1,2})-(\d{1,2})"
+    r"|(\d{1,2})([/-])(\d{1,2})\5(\d{4})"
+)
+_DATE_FORMAT_ERROR = "Invalid date format. Use YYYY-MM-DD, DD/MM/YYYY, or DD-MM-YYYY"
+
+
+@lru_cache(maxsize=1024)
+def _parse_date(value: str) -> date:
+    """
+    Parse a stripped date string in one of the accepted formats.
+    Cached because imports repeat the same dates; the result does not
+    depend on today, so the future check stays with the caller.
+    Raises: ValidationError: If input is not a valid date
+    """
+    parsed_date = None
+
+    # Fast path for full YYYY-MM-DD input. The shape check keeps out the
+    # other ISO forms fromisoformat accepts (e.g. 20240315, 2024-W11-5).
+    if len(value) == 10 and value[4] == '-' and value[7] == '-':
+        try:
+            parsed_date = date.fromisoformat(value)
+        except ValueError:
+            pass
+
+    if parsed_date is None:
+        match = _DATE_RE.fullmatch(value)
+        if match is None:
+            raise ValidationError(_DATE_FORMAT_ERROR)
+
+        year, month, day, day2, _, month2, year2 = match.groups()
+        if year is None:
+            year, month, day = year2, month2, day2
+
+        try:
+            # date() still rejects impossible days such as 2024-02-30
+            parsed_date = date(int(year), int(month), int(day))
+        except ValueError:
+            raise ValidationError(_DATE_FORMAT_ERROR)
+
+    return parsed_date
+
 
 class InputValidator:
     """
@@ -21,11 +72,10 @@ class InputValidator:
         Validate that a string is non-empty.
         Raises: ValidationError: If validation fails
         """
-        if not value or not value.strip():
+        stripped = value.strip() if value else ""
+        if not stripped:
             raise ValidationError(f"{field_name} cannot be empty")
 
-        stripped = value.strip()
-
         if max_length and len(stripped) > max_length:
             raise ValidationError(
                 f"{field_name} must not exceed {max_length} characters"
@@ -34,30 +84,49 @@ class InputValidator:
         return stripped
 
     @staticmethod
-    def validate_date(value: str) -> date:
+    def validate_optional_int(value: Optional[str], field_name: str) -> Optional[int]:
         """
-        Validate and convert date input.
-        Raises: ValidationError: If input is not a valid date or is in the future
+        Convert optional numeric input to an integer.
+        Returns None if no value was entered.
+        Raises: ValidationError: If the value is not a whole number
+        """
+        if not value:
+            return None
+
+        if not _INT_RE.fullmatch(value):
+            raise ValidationError(f"{field_name} must be a whole number")
+
+        return int(value)
+
+    @staticmethod
+    def validate_optional_float(value: Optional[str], field_name: str) -> Optional[float]:
+        """
+        Convert optional numeric input to a float.
+        Returns None if no value was entered.
+        Raises: ValidationError: If the value is not a number
         """
-        formats = [
-            "%Y-%m-%d",      # 2024-03-15
-            "%d/%m/%Y",      # 15/03/2024
-            "%d-%m-%Y"       # 15-03-2024
-        ]
+        if not value:
+            return None
 
-        for date_format in formats:
-            try:
-                parsed_date = datetime.strptime(value.strip(), date_format).date()
+        if not _FLOAT_RE.fullmatch(value):
+            raise ValidationError(f"{field_name} must be a number")
 
-                # Check if date is in the future
-                if parsed_date > date.today():
-                    raise ValidationError("Visit date cannot be in the future")
+        return float(value)
+
+    @staticmethod
+    def validate_date(value: str, today: Optional[date] = None) -> date:
+        """
+        Validate and convert date input.
+        Callers checking many dates can pass today once instead of
+        having it looked up on every call.
+        Raises: ValidationError: If input is not a valid date or is in the future
+        """
+        parsed_date = _parse_date(value.strip())
 
-                return parsed_date
-            except ValueError:
-                continue
+        # Check if date is in the future
+        if today is None:
+            today = date.today()
+        if parsed_date > today:
+            raise ValidationError("Visit date cannot be in the future")
 
-        # If no format worked
-        raise ValidationError(
-            "Invalid date format. Use YYYY-MM-DD, DD/MM/YYYY, or DD-MM-YYYY"
-        )
+        return parsed_date